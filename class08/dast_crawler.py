@@ -0,0 +1,284 @@
+import asyncio
+import hashlib
+import math
+import re
+import resource
+import ssl
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urldefrag, urljoin, urlsplit
+
+from dast_engine import ConnectionPool, DASTEngine
+
+LINK_PATTERN = re.compile(rb"""<a\s[^>]*?href\s*=\s*["']([^"'#>]+)""", re.IGNORECASE)
+
+
+class BloomFilter:
+    """Fixed-size probabilistic set: no false negatives, rare false positives"""
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        """k bit positions by double hashing one 128-bit digest"""
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, item):
+        """Add an item; returns False if it was (probably) already present"""
+        new = False
+        for pos in self._positions(item):
+            byte, bit = divmod(pos, 8)
+            if not self.bits[byte] >> bit & 1:
+                self.bits[byte] |= 1 << bit
+                new = True
+        self.count += new
+        return new
+
+    def __contains__(self, item):
+        return all(self.bits[pos // 8] >> (pos % 8) & 1 for pos in self._positions(item))
+
+    def memory_bytes(self):
+        """Size of the bit array"""
+        return len(self.bits)
+
+
+class VisitedSet:
+    """Exact set for small sites, switching to a Bloom filter past a limit"""
+
+    def __init__(self, exact_limit=50_000, capacity=10_000_000, error_rate=0.001):
+        self.exact_limit = exact_limit
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.exact = set()
+        self.bloom = None
+
+    def add(self, url):
+        """Mark a URL seen; returns False if it was already seen"""
+        if self.bloom is not None:
+            return self.bloom.add(url)
+        if url in self.exact:
+            return False
+        self.exact.add(url)
+        if len(self.exact) > self.exact_limit:
+            self.bloom = BloomFilter(self.capacity, self.error_rate)
+            for seen in self.exact:
+                self.bloom.add(seen)
+            self.exact = set()
+        return True
+
+    def __len__(self):
+        return self.bloom.count if self.bloom is not None else len(self.exact)
+
+    def memory_bytes(self):
+        """Approximate memory held by the dedup structure"""
+        if self.bloom is not None:
+            return self.bloom.memory_bytes()
+        return sys.getsizeof(self.exact) + sum(sys.getsizeof(url) for url in self.exact)
+
+
+def normalize_url(url, base=None):
+    """Absolute URL without fragment, lowercase scheme and host"""
+    if base is not None:
+        url = urljoin(base, url)
+    url, _ = urldefrag(url)
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https"):
+        return None
+    netloc = parts.netloc.lower()
+    path = parts.path or "/"
+    return f"{parts.scheme}://{netloc}{path}" + (f"?{parts.query}" if parts.query else "")
+
+
+class Crawler:
+    """Same-origin crawl that streams every page through DAST header checks"""
+
+    def __init__(self, start_urls, engine=None, workers=20, politeness=0.1,
+                 max_pages=10_000, max_depth=20, exact_limit=50_000):
+        self.start_urls = [normalize_url(u) for u in start_urls]
+        self.origins = {urlsplit(u)[:2] for u in self.start_urls}
+        self.engine = engine or DASTEngine()
+        self.workers = workers
+        self.politeness = politeness
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self.visited = VisitedSet(exact_limit=exact_limit, capacity=max(max_pages * 10, 1000))
+        self.next_request = {}  # host -> earliest time for the next request
+        self.host_locks = {}
+        self.stats = {"pages": 0, "errors": 0, "links_seen": 0, "duplicates": 0, "frontier_peak": 0}
+        self._seq = 0
+
+    def in_scope(self, url):
+        """Same scheme and host:port as one of the start URLs"""
+        return urlsplit(url)[:2] in self.origins
+
+    def priority(self, url, depth):
+        """Lower is sooner: shallow pages first, query-string pages later"""
+        return depth + (2 if "?" in url else 0) + url.count("/") * 0.01
+
+    def enqueue(self, frontier, url, depth):
+        """Add a URL to the frontier if it is new and in scope"""
+        self.stats["links_seen"] += 1
+        if url is None or depth > self.max_depth or not self.in_scope(url):
+            return
+        if not self.visited.add(url):
+            self.stats["duplicates"] += 1
+            return
+        self._seq += 1
+        frontier.put_nowait((self.priority(url, depth), self._seq, url, depth))
+        self.stats["frontier_peak"] = max(self.stats["frontier_peak"], frontier.qsize())
+
+    async def polite_wait(self, host):
+        """Space out requests to the same host by `politeness` seconds"""
+        if not self.politeness:
+            return
+        lock = self.host_locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            now = time.monotonic()
+            wait = self.next_request.get(host, now) - now
+            self.next_request[host] = max(now, self.next_request.get(host, now)) + self.politeness
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    async def worker(self, pool, frontier, on_findings):
+        """Fetch pages from the frontier until cancelled"""
+        while True:
+            _, _, url, depth = await frontier.get()
+            try:
+                await self.visit(pool, frontier, url, depth, on_findings)
+            except Exception:
+                # One bad page must not take a worker down and stall join()
+                self.stats["errors"] += 1
+            finally:
+                frontier.task_done()
+
+    async def visit(self, pool, frontier, url, depth, on_findings):
+        """Fetch one page, record its findings and enqueue its links"""
+        if self.stats["pages"] >= self.max_pages:
+            return
+        self.stats["pages"] += 1
+        await self.polite_wait(urlsplit(url).netloc)
+        try:
+            status, headers, body = await self.engine.fetch(pool, url, keep_body=True)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError,
+                asyncio.LimitOverrunError, ValueError):
+            self.stats["errors"] += 1
+            return
+
+        findings = self.engine.header_findings(url, headers)
+        if url.startswith("https://"):
+            parts = urlsplit(url)
+            try:
+                tls = await self.engine.check_tls(parts.hostname, parts.port or 443, url)
+            except (OSError, ssl.SSLError, asyncio.TimeoutError, ValueError) as e:
+                self.stats["errors"] += 1
+                findings.append({"type": "scan_error", "issue": str(e) or type(e).__name__,
+                                 "severity": "LOW", "url": url})
+            else:
+                findings.extend(f for f in tls["findings"] if f["url"] == url)
+        self.engine.findings.extend(findings)
+        if on_findings:
+            on_findings(url, findings)
+
+        if "html" in headers.get("content-type", "") and body:
+            for link in LINK_PATTERN.findall(body):
+                self.enqueue(frontier, normalize_url(link.decode("latin-1"), url), depth + 1)
+
+    async def crawl_async(self, on_findings=None):
+        """Run the crawl until the frontier drains or max_pages is hit"""
+        frontier = asyncio.PriorityQueue()
+        for url in self.start_urls:
+            self.enqueue(frontier, url, 0)
+
+        pool = ConnectionPool(self.engine.per_host, self.engine.global_limit, self.engine.timeout)
+        tasks = [asyncio.ensure_future(self.worker(pool, frontier, on_findings)) for _ in range(self.workers)]
+        try:
+            await frontier.join()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            pool.close()
+
+    def crawl(self, on_findings=None):
+        """Crawl and return stats (rate and memory included)"""
+        started = time.perf_counter()
+        asyncio.run(self.crawl_async(on_findings))
+        elapsed = time.perf_counter() - started
+        self.stats["seconds"] = round(elapsed, 3)
+        self.stats["pages_per_second"] = round(self.stats["pages"] / elapsed, 1) if elapsed else 0.0
+        self.stats["visited"] = len(self.visited)
+        self.stats["dedup"] = "bloom" if self.visited.bloom is not None else "exact"
+        self.stats["dedup_memory_bytes"] = self.visited.memory_bytes()
+        self.stats["max_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+        return self.stats
+
+
+def start_generated_site(num_pages=20_000, links_per_page=8):
+    """Serve a synthetic site: /p/<i> pages linking to pseudo-random pages"""
+
+    class SiteHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            try:
+                page = int(self.path.rsplit("/", 1)[-1].split("?")[0])
+            except ValueError:
+                page = 0
+            links = "".join(
+                f'<a href="/p/{(page * 31 + k * 7919 + 1) % num_pages}">link</a>'
+                for k in range(links_per_page)
+            )
+            body = f"<html><body><h1>Page {page}</h1>{links}<a href='#top'>top</a></body></html>".encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("X-Content-Type-Options", "nosniff")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    ThreadingHTTPServer.request_queue_size = 1024
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SiteHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    num_pages = 20_000
+    server = start_generated_site(num_pages)
+    start = f"http://127.0.0.1:{server.server_address[1]}/p/0"
+
+    for label, exact_limit in (("exact set", num_pages * 2), ("bloom filter", 1_000)):
+        print(f"=== Crawl {num_pages} pages ({label}) ===")
+        engine = DASTEngine(per_host=20)
+        crawler = Crawler([start], engine=engine, workers=20, politeness=0,
+                          max_pages=num_pages, exact_limit=exact_limit)
+        stats = crawler.crawl()
+        print(f"  Pages: {stats['pages']}  Rate: {stats['pages_per_second']} pages/s")
+        print(f"  Dedup: {stats['dedup']} {stats['dedup_memory_bytes'] / 1024:.0f} KB  "
+              f"duplicates skipped: {stats['duplicates']}  frontier peak: {stats['frontier_peak']}")
+        print(f"  Findings: {len(engine.findings)}  Max RSS: {stats['max_rss_mb']} MB")
+        print()
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("       DAST CRAWLER")
+    print("=" * 60)
+    print()
+    main()
+    print("\n" + "=" * 60)
+    print("           DEMO COMPLETE")
+    print("=" * 60)
@@ -0,0 +1,369 @@
+import asyncio
+import os
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+import warnings
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+# Header -> severity when missing (HSTS only applies to https)
+SECURITY_HEADERS = {
+    "Content-Security-Policy": "HIGH",
+    "Strict-Transport-Security": "HIGH",
+    "X-Frame-Options": "MEDIUM",
+    "X-Content-Type-Options": "LOW",
+    "Referrer-Policy": "LOW",
+}
+WEAK_CIPHERS = ("RC4", "3DES", "DES-CBC", "NULL", "EXPORT", "MD5")
+CERT_EXPIRY_WARNING_DAYS = 30
+
+
+class ConnectionPool:
+    """Keep-alive HTTP(S) connections per (scheme, host, port)
+
+    A semaphore per host caps concurrent requests (and so open
+    connections) to it; a global semaphore caps the whole engine.
+    """
+
+    def __init__(self, per_host=6, global_limit=200, timeout=10.0):
+        self.per_host = per_host
+        self.timeout = timeout
+        self.global_limit = asyncio.Semaphore(global_limit)
+        self.host_limits = {}
+        self.idle = {}
+        # Header checks don't depend on trust; the TLS check reports that
+        self.ssl_context = ssl.create_default_context()
+        self.ssl_context.check_hostname = False
+        self.ssl_context.verify_mode = ssl.CERT_NONE
+        self.opened = 0
+        self.reused = 0
+
+    def limit(self, key):
+        """Per-host semaphore"""
+        if key not in self.host_limits:
+            self.host_limits[key] = asyncio.Semaphore(self.per_host)
+        return self.host_limits[key]
+
+    async def acquire(self, key):
+        """An idle connection for the host, or a new one"""
+        idle = self.idle.get(key)
+        while idle:
+            reader, writer = idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                self.reused += 1
+                return reader, writer
+        scheme, host, port = key
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port, ssl=self.ssl_context if scheme == "https" else None),
+            self.timeout
+        )
+        self.opened += 1
+        return reader, writer
+
+    def release(self, key, conn, reusable):
+        """Return a connection to the pool, or close it"""
+        if reusable:
+            self.idle.setdefault(key, []).append(conn)
+        else:
+            conn[1].close()
+
+    def close(self):
+        """Close every idle connection"""
+        for conns in self.idle.values():
+            for _, writer in conns:
+                writer.close()
+        self.idle = {}
+
+
+async def _read_response(reader, keep_body=False):
+    """Read one HTTP/1.1 response; returns (status, headers, body, reusable)
+
+    The body is drained either way (so the connection can be reused) but
+    only returned when `keep_body` is set.
+    """
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split()[1])
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+
+    reusable = headers.get("connection", "").lower() != "close" and lines[0].startswith("HTTP/1.1")
+    chunks = []
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+            chunks.append((await reader.readexactly(size + 2))[:-2])
+            if size == 0:
+                break
+    elif "content-length" in headers:
+        chunks.append(await reader.readexactly(int(headers["content-length"])))
+    elif status not in (204, 304) and not 100 <= status < 200:
+        chunks.append(await reader.read())  # body runs to connection close
+        reusable = False
+    return status, headers, b"".join(chunks) if keep_body else None, reusable
+
+
+class DASTEngine:
+    """Concurrent security header and TLS checks for many URLs"""
+
+    def __init__(self, per_host=6, global_limit=200, timeout=10.0, cafile=None):
+        self.per_host = per_host
+        self.global_limit = global_limit
+        self.timeout = timeout
+        self.cafile = cafile
+        self.findings = []
+        self.tls_cache = {}  # (host, port) -> task with TLS findings
+        self.stats = {"targets": 0, "errors": 0, "tls_checks": 0, "tls_cache_hits": 0}
+
+    async def fetch(self, pool, url, keep_body=False):
+        """GET a URL over a pooled connection; returns (status, headers, body)"""
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        key = (parts.scheme, parts.hostname, port)
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        request = (
+            f"GET {path} HTTP/1.1\r\nHost: {parts.netloc}\r\n"
+            f"User-Agent: DASTEngine\r\nAccept: */*\r\nConnection: keep-alive\r\n\r\n"
+        ).encode()
+
+        # Per-host first: a request queued behind a busy host must not
+        # hold a global slot that other hosts could be using
+        async with pool.limit(key), pool.global_limit:
+            # A pooled connection may have been closed by the server
+            # while idle; retry once on a fresh one
+            for attempt in (1, 2):
+                conn = await pool.acquire(key)
+                try:
+                    conn[1].write(request)
+                    await conn[1].drain()
+                    status, headers, body, reusable = await asyncio.wait_for(
+                        _read_response(conn[0], keep_body), self.timeout
+                    )
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    conn[1].close()
+                    if attempt == 2:
+                        raise
+                    continue
+                except BaseException:
+                    conn[1].close()
+                    raise
+                pool.release(key, conn, reusable)
+                return status, headers, body
+
+    def header_findings(self, url, headers):
+        """Missing security headers for one response"""
+        https = url.startswith("https://")
+        return [{
+            "type": "missing_security_header",
+            "header": header,
+            "severity": severity,
+            "url": url
+        } for header, severity in SECURITY_HEADERS.items()
+            if header.lower() not in headers and (https or header != "Strict-Transport-Security")]
+
+    async def _handshake(self, host, port, context):
+        """Open a TLS connection and return its SSL object details"""
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port, ssl=context, server_hostname=host), self.timeout
+        )
+        ssl_object = writer.get_extra_info("ssl_object")
+        details = (ssl_object.version(), ssl_object.cipher(), ssl_object.getpeercert())
+        writer.close()
+        return details
+
+    async def _check_tls(self, host, port, url):
+        """TLS findings for one endpoint: trust, expiry, protocol, cipher"""
+        self.stats["tls_checks"] += 1
+        findings = []
+
+        def finding(issue, severity):
+            findings.append({"type": "ssl_check", "issue": issue, "severity": severity, "url": url})
+
+        unverified = ssl.create_default_context()
+        unverified.check_hostname = False
+        unverified.verify_mode = ssl.CERT_NONE
+        try:
+            version, cipher, cert = await self._handshake(
+                host, port, ssl.create_default_context(cafile=self.cafile)
+            )
+            expires = datetime.fromtimestamp(ssl.cert_time_to_seconds(cert["notAfter"]), timezone.utc)
+            days_left = (expires - datetime.now(timezone.utc)).days
+            if days_left < CERT_EXPIRY_WARNING_DAYS:
+                finding(f"Certificate expires in {days_left} days", "HIGH" if days_left < 7 else "MEDIUM")
+        except ssl.SSLCertVerificationError as e:
+            finding(f"Untrusted certificate: {e.verify_message}", "HIGH")
+            version, cipher, _ = await self._handshake(host, port, unverified)
+
+        if cipher and any(weak in cipher[0] for weak in WEAK_CIPHERS):
+            finding(f"Weak cipher negotiated: {cipher[0]}", "HIGH")
+
+        # Does the server still accept TLS 1.0/1.1?
+        legacy = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+        legacy.check_hostname = False
+        legacy.verify_mode = ssl.CERT_NONE
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", DeprecationWarning)
+                legacy.minimum_version = ssl.TLSVersion.TLSv1
+                legacy.maximum_version = ssl.TLSVersion.TLSv1_1
+            legacy.set_ciphers("DEFAULT:@SECLEVEL=0")
+            legacy_version, _, _ = await self._handshake(host, port, legacy)
+            finding(f"{legacy_version} enabled", "HIGH")
+        except (ssl.SSLError, ValueError, ConnectionError, asyncio.TimeoutError):
+            pass  # refused, or this OpenSSL build can't offer it
+
+        return {"version": version, "cipher": cipher[0] if cipher else None, "findings": findings}
+
+    def check_tls(self, host, port, url):
+        """Cached TLS check; concurrent callers share one handshake"""
+        key = (host, port)
+        if key in self.tls_cache:
+            self.stats["tls_cache_hits"] += 1
+        else:
+            self.tls_cache[key] = asyncio.ensure_future(self._check_tls(host, port, url))
+        return self.tls_cache[key]
+
+    async def scan_url(self, pool, url):
+        """Header (and, for https, TLS) findings for one URL"""
+        findings = []
+        try:
+            status, headers, _ = await self.fetch(pool, url)
+            findings.extend(self.header_findings(url, headers))
+            parts = urlsplit(url)
+            if parts.scheme == "https":
+                tls = await self.check_tls(parts.hostname, parts.port or 443, url)
+                # Endpoint-level issues are reported once, on the URL that ran the check
+                findings.extend(f for f in tls["findings"] if f["url"] == url)
+        except (OSError, ssl.SSLError, asyncio.TimeoutError, asyncio.IncompleteReadError,
+                asyncio.LimitOverrunError, ValueError) as e:
+            self.stats["errors"] += 1
+            findings.append({"type": "scan_error", "issue": str(e) or type(e).__name__,
+                             "severity": "LOW", "url": url})
+        self.stats["targets"] += 1
+        return findings
+
+    async def scan_async(self, urls):
+        """Scan all URLs concurrently"""
+        pool = ConnectionPool(self.per_host, self.global_limit, self.timeout)
+        try:
+            for findings in asyncio.as_completed([self.scan_url(pool, url) for url in urls]):
+                self.findings.extend(await findings)
+        finally:
+            pool.close()
+        self.stats["connections_opened"] = pool.opened
+        self.stats["connections_reused"] = pool.reused
+        return self.findings
+
+    def scan(self, urls):
+        """Scan all URLs; returns the findings"""
+        started = time.perf_counter()
+        asyncio.run(self.scan_async(urls))
+        elapsed = time.perf_counter() - started
+        self.stats["seconds"] = round(elapsed, 3)
+        self.stats["targets_per_second"] = round(len(urls) / elapsed, 1) if elapsed else 0.0
+        return self.findings
+
+    def get_report(self):
+        """Generate DAST report"""
+        by_severity = {"HIGH": 0, "MEDIUM": 0, "LOW": 0}
+        for f in self.findings:
+            by_severity[f["severity"]] = by_severity.get(f["severity"], 0) + 1
+        return {
+            "scan_type": "DAST",
+            "timestamp": datetime.now().isoformat(),
+            "total_findings": len(self.findings),
+            "by_severity": by_severity,
+            "stats": self.stats,
+            "findings": self.findings
+        }
+
+
+class _DemoHandler(BaseHTTPRequestHandler):
+    """Keep-alive handler that sets some, but not all, security headers"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b"<html><body>ok</body></html>"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("X-Frame-Options", "DENY")
+        if self.path.startswith("/secure"):
+            self.send_header("Content-Security-Policy", "default-src 'self'")
+            self.send_header("X-Content-Type-Options", "nosniff")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_test_servers(workdir):
+    """Local HTTP and HTTPS servers (self-signed cert via openssl)"""
+    cert = os.path.join(workdir, "cert.pem")
+    key = os.path.join(workdir, "key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "20",
+         "-subj", "/CN=localhost", "-addext", "subjectAltName=DNS:localhost,IP:127.0.0.1",
+         "-keyout", key, "-out", cert],
+        check=True, capture_output=True
+    )
+
+    ThreadingHTTPServer.request_queue_size = 1024
+    http_server = ThreadingHTTPServer(("127.0.0.1", 0), _DemoHandler)
+    https_server = ThreadingHTTPServer(("127.0.0.1", 0), _DemoHandler)
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert, key)
+    https_server.socket = context.wrap_socket(https_server.socket, server_side=True)
+
+    for server in (http_server, https_server):
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    return http_server, https_server, cert
+
+
+def main():
+    with tempfile.TemporaryDirectory() as workdir:
+        http_server, https_server, cert = start_test_servers(workdir)
+        http_base = f"http://127.0.0.1:{http_server.server_address[1]}"
+        https_base = f"https://localhost:{https_server.server_address[1]}"
+        urls = [f"{http_base}/page/{i}" for i in range(1000)]
+        urls += [f"{https_base}/{'secure' if i % 2 else 'page'}/{i}" for i in range(1000)]
+
+        print(f"=== Scanning {len(urls)} URLs ===")
+        engine = DASTEngine(per_host=20, cafile=cert)
+        engine.scan(urls)
+        report = engine.get_report()
+
+        stats = report["stats"]
+        print(f"Targets/sec: {stats['targets_per_second']}  ({stats['seconds']}s)")
+        print(f"Connections opened: {stats['connections_opened']}  reused: {stats['connections_reused']}")
+        print(f"TLS handshake checks: {stats['tls_checks']}  cache hits: {stats['tls_cache_hits']}")
+        print(f"Findings: {report['total_findings']} {report['by_severity']}")
+        seen = set()
+        for f in report["findings"]:
+            label = f.get("header", f.get("issue"))
+            if (f["type"], label) not in seen:
+                seen.add((f["type"], label))
+                print(f"  [{f['severity']}] {f['type']}: {label}")
+
+        http_server.shutdown()
+        https_server.shutdown()
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("       CONCURRENT DAST ENGINE")
+    print("=" * 60)
+    print()
+    main()
+    print("\n" + "=" * 60)
+    print("           DEMO COMPLETE")
+    print("=" * 60)
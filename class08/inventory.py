@@ -0,0 +1,374 @@
+import fnmatch
+import hashlib
+import json
+import marshal
+import os
+import random
+import re
+import shlex
+import stat
+import tempfile
+import time
+
+try:
+    import yaml
+except ImportError:  # YAML inventories need PyYAML; JSON and INI work without it
+    yaml = None
+
+# Bit positions set in each byte value, for turning a bitmask into host ids
+BYTE_BITS = [[bit for bit in range(8) if value >> bit & 1] for value in range(256)]
+SELECTOR_SPLIT = re.compile(r"[:,]")
+
+
+def _private_cache_dir():
+    """Per-user 0700 cache directory under the temp dir, or None if it can't be trusted"""
+    path = os.path.join(tempfile.gettempdir(), f"inventory-cache-{os.getuid()}")
+    try:
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        info = os.lstat(path)
+    except OSError:
+        return None
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        return None
+    return path
+
+
+class Inventory:
+    """Hosts with group, tag and attribute indexes kept as int bitmasks
+
+    Host i is bit i. Every group, tag and (attribute, value) pair maps to
+    one Python int, so a selector over 100k hosts is a handful of
+    big-integer AND/OR/NOT operations.
+    """
+
+    def __init__(self):
+        self.hosts = []           # [{"host": name, ...vars}]
+        self.ids = {}             # name -> bit
+        self.groups = {}          # group -> bitmask (children included)
+        self.tags = {}            # tag -> bitmask
+        self.attributes = {}      # (key, value) -> bitmask
+        self.group_vars = {}
+        self.children = {}
+        self.resolved = {}        # selector term -> bitmask
+        self.compiled = {}        # selector -> (unions, intersections, exclusions)
+
+    # --- building ---
+
+    def add_host(self, name, groups=(), **hostvars):
+        """Add a host (or merge into an existing one)"""
+        if name not in self.ids:
+            self.ids[name] = len(self.hosts)
+            self.hosts.append({"host": name})
+        host_id = self.ids[name]
+        self.hosts[host_id].update(hostvars)
+        for group in groups:
+            self.add_to_group(group, name)
+        return host_id
+
+    def add_to_group(self, group, name):
+        self.groups[group] = self.groups.get(group, 0) | 1 << self.ids[name]
+
+    def add_child(self, group, child):
+        self.children.setdefault(group, set()).add(child)
+        self.groups.setdefault(group, 0)
+        self.groups.setdefault(child, 0)
+
+    def build_indexes(self):
+        """Flatten child groups, apply group vars and index tags/attributes"""
+        resolved = {}
+
+        def members(group, seen=()):
+            if group not in resolved:
+                mask = self.groups.get(group, 0)
+                for child in self.children.get(group, ()):
+                    if child not in seen:
+                        mask |= members(child, seen + (group,))
+                resolved[group] = mask
+            return resolved[group]
+
+        for group in list(self.groups):
+            members(group)
+        self.groups = resolved
+        self.groups["all"] = (1 << len(self.hosts)) - 1
+
+        for group, group_vars in self.group_vars.items():
+            for host_id in self.bits(self.groups.get(group, 0)):
+                host = self.hosts[host_id]
+                for key, value in group_vars.items():
+                    host.setdefault(key, value)
+
+        self.tags, self.attributes = {}, {}
+        for host_id, host in enumerate(self.hosts):
+            bit = 1 << host_id
+            tags = host.get("tags", [])
+            if isinstance(tags, str):
+                tags = [t.strip() for t in tags.split(",") if t.strip()]
+            for tag in tags:
+                self.tags[tag] = self.tags.get(tag, 0) | bit
+            for key, value in host.items():
+                if key not in ("host", "tags") and isinstance(value, (str, int, float, bool)):
+                    attr = (key, str(value))
+                    self.attributes[attr] = self.attributes.get(attr, 0) | bit
+        self.resolved.clear()
+        self.compiled.clear()
+
+    # --- loading ---
+
+    @classmethod
+    def load(cls, path, cache_dir=None):
+        """Load an inventory file, reusing an on-disk cache while its mtime is unchanged
+
+        The cache is marshal data (plain values only, nothing executable)
+        kept in a private per-user directory unless `cache_dir` is given.
+        """
+        file_stat = os.stat(path)
+        cache_dir = cache_dir or _private_cache_dir()
+        cache_path = cache_dir and os.path.join(
+            cache_dir, "inventory-" + hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:16] + ".marshal"
+        )
+        stamp = (file_stat.st_mtime_ns, file_stat.st_size)
+        if cache_path:
+            try:
+                with open(cache_path, "rb") as f:
+                    cached_stamp, state = marshal.loads(f.read())
+                if cached_stamp == stamp:
+                    inventory = cls()
+                    inventory.__dict__.update(state)  # resolved/compiled start empty
+                    inventory.cache_hit = True
+                    return inventory
+            except (OSError, EOFError, TypeError, ValueError):
+                pass
+
+        inventory = cls()
+        if path.endswith((".yml", ".yaml")):
+            if yaml is None:
+                raise ImportError("PyYAML is required for YAML inventories")
+            with open(path) as f:
+                inventory.load_tree(yaml.safe_load(f) or {})
+        elif path.endswith(".json"):
+            with open(path) as f:
+                inventory.load_tree(json.load(f))
+        else:
+            inventory.load_ini(path)
+        inventory.build_indexes()
+        inventory.cache_hit = False
+
+        if cache_path:
+            state = {k: v for k, v in inventory.__dict__.items() if k not in ("cache_hit", "resolved", "compiled")}
+            try:
+                data = marshal.dumps((stamp, state))
+            except ValueError:  # e.g. dates from YAML: just don't cache
+                return inventory
+            tmp_path = f"{cache_path}.tmp"
+            try:
+                with open(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, cache_path)
+            except OSError:  # unwritable or full cache dir: return it uncached
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+        return inventory
+
+    def load_tree(self, data):
+        """Ansible-style YAML/JSON: {group: {hosts: {name: vars}, vars: {}, children: {group: ...}}}"""
+        def walk(group, body):
+            body = body or {}
+            hosts = body.get("hosts") or {}
+            if isinstance(hosts, list):
+                hosts = {name: {} for name in hosts}
+            for name, hostvars in hosts.items():
+                self.add_host(name, [group], **(hostvars or {}))
+            if body.get("vars"):
+                self.group_vars.setdefault(group, {}).update(body["vars"])
+            for child, child_body in (body.get("children") or {}).items():
+                self.add_child(group, child)
+                walk(child, child_body)
+
+        for group, body in data.items():
+            walk(group, body)
+
+    def load_ini(self, path):
+        """Ansible-style INI: [group] host k=v, [group:children], [group:vars]"""
+        # Host lines like "web1 user=admin" are not key=value pairs, so
+        # this is parsed by hand rather than with configparser
+        with open(path) as f:
+            lines = f.read().splitlines()
+        group = "ungrouped"
+        kind = "hosts"
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith(("#", ";")):
+                continue
+            if line.startswith("["):
+                group, _, kind = line.strip("[]").partition(":")
+                kind = kind or "hosts"
+                continue
+            if kind == "children":
+                self.add_child(group, line)
+            elif kind == "vars":
+                key, _, value = line.partition("=")
+                self.group_vars.setdefault(group, {})[key.strip()] = value.strip()
+            else:
+                name, *pairs = shlex.split(line)
+                self.add_host(name, [group], **dict(pair.split("=", 1) for pair in pairs if "=" in pair))
+
+    # --- selecting ---
+
+    def resolve(self, term):
+        """Bitmask for one selector term
+
+        `all`/`*`, a group, a tag or a host name; `key=value` for an
+        attribute; globs match group and host names.
+        """
+        if term not in self.resolved:
+            self.resolved[term] = self._resolve(term)
+        return self.resolved[term]
+
+    def _resolve(self, term):
+        if term in ("all", "*"):
+            return self.groups.get("all", 0)
+        if "=" in term:
+            key, _, value = term.partition("=")
+            if key == "tag":
+                return self.tags.get(value, 0)
+            return self.attributes.get((key, value), 0)
+        if any(ch in term for ch in "*?["):
+            mask = 0
+            for group in fnmatch.filter(self.groups, term):
+                mask |= self.groups[group]
+            for name in fnmatch.filter(self.ids, term):
+                mask |= 1 << self.ids[name]
+            return mask
+        mask = self.groups.get(term, 0) | self.tags.get(term, 0)
+        if term in self.ids:
+            mask |= 1 << self.ids[term]
+        return mask
+
+    def compile(self, selector):
+        """Compile `web:&prod:!canary` into (unions, intersections, exclusions)"""
+        if selector in self.compiled:
+            return self.compiled[selector]
+        union, intersect, exclude = [], [], []
+        for term in SELECTOR_SPLIT.split(selector):
+            term = term.strip()
+            if not term:
+                continue
+            if term[0] == "&":
+                intersect.append(term[1:])
+            elif term[0] == "!":
+                exclude.append(term[1:])
+            else:
+                union.append(term)
+        self.compiled[selector] = (tuple(union), tuple(intersect), tuple(exclude))
+        return self.compiled[selector]
+
+    def mask(self, selector):
+        """Bitmask of the hosts a selector picks (Ansible pattern semantics)"""
+        union, intersect, exclude = self.compile(selector)
+        mask = 0
+        for term in union or ("all",):
+            mask |= self.resolve(term)
+        for term in intersect:
+            mask &= self.resolve(term)
+        for term in exclude:
+            mask &= ~self.resolve(term)
+        return mask
+
+    @staticmethod
+    def bits(mask):
+        """Host ids set in a bitmask, ascending"""
+        ids = []
+        data = mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+        for offset, byte in enumerate(data):
+            if byte:
+                base = offset * 8
+                ids.extend(base + bit for bit in BYTE_BITS[byte])
+        return ids
+
+    def select(self, selector):
+        """Host dicts (`host`, `user`, `type`, ... vars) matching a selector"""
+        return [self.hosts[i] for i in self.bits(self.mask(selector))]
+
+    def count(self, selector):
+        return bin(self.mask(selector)).count("1")
+
+
+def generate_inventory(path, hosts=100_000, seed=7):
+    """A large JSON inventory: roles, environments, regions and tags"""
+    rng = random.Random(seed)
+    roles = ["web", "db", "cache", "queue", "worker"]
+    envs = {"prod": {}, "staging": {}, "dev": {}}
+    groups = {role: {"hosts": {}} for role in roles}
+    for i in range(hosts):
+        role = roles[i % len(roles)]
+        env = rng.choices(list(envs), weights=[6, 3, 1])[0]
+        tags = [env] + (["canary"] if rng.random() < 0.02 else [])
+        groups[role]["hosts"][f"{role}{i:06}"] = {
+            "user": "admin", "type": role, "region": rng.choice(["us-east", "us-west", "eu-central"]),
+            "tags": tags
+        }
+    data = {"all": {"children": groups, "vars": {"ssh_port": 22}}}
+    with open(path, "w") as f:
+        json.dump(data, f)
+
+
+def main():
+    workdir = tempfile.mkdtemp(prefix="inventory-")
+
+    print("=== INI Inventory ===")
+    ini_path = os.path.join(workdir, "hosts.ini")
+    with open(ini_path, "w") as f:
+        f.write("[web]\n192.168.1.10 user=admin type=web tags=prod\n192.168.1.11 user=admin type=web tags=prod,canary\n"
+                "[db]\n192.168.1.20 user=admin type=db tags=prod\n"
+                "[staging]\n192.168.2.10 user=deploy type=web tags=staging\n"
+                "[app:children]\nweb\ndb\n[app:vars]\nssh_port=22\n")
+    inventory = Inventory.load(ini_path)
+    for selector in ("web", "app:&prod:!canary", "tag=canary", "type=web:!staging"):
+        print(f"  {selector:<20} -> {[h['host'] for h in inventory.select(selector)]}")
+
+    if yaml is not None:
+        print()
+        print("=== YAML Inventory ===")
+        yaml_path = os.path.join(workdir, "hosts.yml")
+        with open(yaml_path, "w") as f:
+            f.write("all:\n  children:\n    web:\n      hosts:\n        web1: {user: admin, tags: [prod]}\n"
+                    "        web2: {user: admin, tags: [prod, canary]}\n    db:\n      hosts:\n"
+                    "        db1: {user: admin, tags: [prod]}\n      vars: {type: db}\n")
+        inventory = Inventory.load(yaml_path)
+        print(f"  web:&prod:!canary    -> {[h['host'] for h in inventory.select('web:&prod:!canary')]}")
+        print(f"  db vars              -> {inventory.select('db')}")
+
+    print()
+    print("=== 100k-Host Inventory ===")
+    big_path = os.path.join(workdir, "fleet.json")
+    generate_inventory(big_path)
+    for run in ("parse", "cached"):
+        start = time.perf_counter()
+        inventory = Inventory.load(big_path)
+        print(f"  load ({run}): {(time.perf_counter() - start) * 1000:.0f}ms  cache hit: {inventory.cache_hit}")
+
+    for selector in ("web:&prod:!canary", "web,db:&region=eu-central", "cache*:&staging", "all:!prod"):
+        start = time.perf_counter()
+        count = inventory.count(selector)
+        mask_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        hosts = inventory.select(selector)
+        print(f"  {selector:<28} {count:>6} hosts  count {mask_ms:.2f}ms  "
+              f"select {(time.perf_counter() - start) * 1000:.2f}ms")
+    assert len(hosts) == count
+
+    os.utime(big_path)  # touching the file invalidates the cache
+    print(f"  after touch: cache hit {Inventory.load(big_path).cache_hit}")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("       SSH INVENTORY ENGINE")
+    print("=" * 60)
+    print()
+    main()
+    print("\n" + "=" * 60)
+    print("           DEMO COMPLETE")
+    print("=" * 60)
@@ -0,0 +1,235 @@
+import asyncio
+import ipaddress
+import time
+
+from network_monitor import NetworkMonitor
+
+# Device type is picked by the first fingerprint whose ports are all open
+DEFAULT_FINGERPRINTS = [
+    ("router", {179}),           # BGP
+    ("router", {23, 161}),
+    ("firewall", {443, 4433}),
+    ("database", {5432}),
+    ("database", {3306}),
+    ("server", {22, 80}),
+    ("server", {22, 443}),
+    ("switch", {23}),
+    ("server", {22}),
+]
+DEFAULT_PORTS = sorted({port for _, ports in DEFAULT_FINGERPRINTS for port in ports} | {80, 443})
+
+
+class RateLimiter:
+    """Token bucket shared by every probe of a sweep"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until one probe is allowed to start"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class DiscoveryScanner:
+    """Sweeps CIDR ranges with TCP connect probes and registers devices"""
+
+    def __init__(self, monitor, ports=None, fingerprints=None,
+                 concurrency=500, rate=5000, timeout=0.5):
+        self.monitor = monitor
+        self.ports = list(ports or DEFAULT_PORTS)
+        self.fingerprints = fingerprints or DEFAULT_FINGERPRINTS
+        self.concurrency = concurrency
+        self.rate = rate
+        self.timeout = timeout
+        self.known = {}  # ip -> {"name", "type", "ports"}
+        self.gone = {}   # ip -> last known entry; its device stays registered
+
+    def classify(self, open_ports):
+        """Map a set of open ports to a device type"""
+        for device_type, required in self.fingerprints:
+            if required <= open_ports:
+                return device_type
+        return "host"
+
+    async def _probe(self, ip, port, limiter):
+        """TCP connect probe; True if the port accepted the connection"""
+        await limiter.acquire()
+        try:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(ip, port), timeout=self.timeout
+            )
+        except (OSError, asyncio.TimeoutError):
+            return False
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+        return True
+
+    def targets(self, *cidrs):
+        """Lazily yield every (ip, port) to probe"""
+        for cidr in cidrs:
+            for ip in ipaddress.ip_network(cidr, strict=False).hosts():
+                for port in self.ports:
+                    yield str(ip), port
+
+    async def sweep_async(self, *cidrs):
+        """Probe every host/port in the ranges; returns {ip: open ports}
+
+        Targets are fed through a bounded queue to `concurrency` worker
+        coroutines, so memory stays flat even for a /8; only responsive
+        hosts are kept.
+        """
+        limiter = RateLimiter(self.rate)
+        queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        responsive = {}
+
+        async def worker():
+            while True:
+                target = await queue.get()
+                if target is None:
+                    return
+                ip, port = target
+                if await self._probe(ip, port, limiter):
+                    responsive.setdefault(ip, set()).add(port)
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        try:
+            for target in self.targets(*cidrs):
+                await queue.put(target)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+        return responsive
+
+    def discover(self, *cidrs):
+        """Sweep and register new hosts; returns only what changed"""
+        started = time.perf_counter()
+        responsive = asyncio.run(self.sweep_async(*cidrs))
+        networks = [ipaddress.ip_network(cidr, strict=False) for cidr in cidrs]
+
+        delta = {"added": [], "returned": [], "changed": [], "gone": []}
+        for ip, open_ports in sorted(responsive.items()):
+            device_type = self.classify(open_ports)
+            known = self.known.get(ip)
+            if known is None and ip in self.gone:
+                # Back after an outage: reuse the device still registered
+                known = self.known[ip] = self.gone.pop(ip)
+                delta["returned"].append(known)
+            if known is None:
+                name = f"{device_type}-{ip}"
+                self.monitor.add_device(name, ip, device_type)
+                self.known[ip] = {"name": name, "type": device_type, "ports": open_ports}
+                delta["added"].append(self.known[ip])
+            elif known["ports"] != open_ports:
+                known["ports"] = open_ports
+                known["type"] = device_type
+                self.monitor.by_name[known["name"]]["type"] = device_type
+                if known not in delta["returned"]:
+                    delta["changed"].append(known)
+
+        for ip in sorted(set(self.known) - set(responsive)):
+            if any(ipaddress.ip_address(ip) in network for network in networks):
+                # Leave the device registered; the monitor reports it DOWN
+                self.gone[ip] = self.known.pop(ip)
+                delta["gone"].append(self.gone[ip])
+
+        delta["duration"] = time.perf_counter() - started
+        return delta
+
+
+async def _start_listeners(hosts):
+    """Open local listeners: {ip: [ports]} -> list of servers"""
+    async def accept(reader, writer):
+        writer.close()
+
+    servers = []
+    for ip, ports in hosts.items():
+        for port in ports:
+            servers.append(await asyncio.start_server(accept, ip, port))
+    return servers
+
+
+def main():
+    # Unprivileged stand-ins for the well-known ports
+    ssh, http, https, pg = 12022, 12080, 12443, 15432
+    fingerprints = [
+        ("database", {pg}),
+        ("server", {ssh, http}),
+        ("firewall", {https}),
+        ("server", {ssh}),
+    ]
+    monitor = NetworkMonitor()
+    scanner = DiscoveryScanner(monitor, ports=[ssh, http, https, pg],
+                               fingerprints=fingerprints, rate=2000)
+
+    async def run_sweeps():
+        loop = asyncio.get_running_loop()
+        servers = await _start_listeners({
+            "127.0.0.2": [ssh, http],
+            "127.0.0.3": [ssh, http],
+            "127.0.0.4": [ssh, pg],
+            "127.0.0.5": [https],
+        })
+
+        print("=== Sweep 1: 127.0.0.0/26 ===")
+        delta = await loop.run_in_executor(None, scanner.discover, "127.0.0.0/26")
+        for host in delta["added"]:
+            print(f"  + {host['name']} ports={sorted(host['ports'])}")
+        print(f"  {len(delta['added'])} added in {delta['duration']:.2f}s")
+        print()
+
+        servers[0].close()  # 127.0.0.2 loses ssh
+        servers[6].close()  # 127.0.0.5 goes away
+        servers.append(await asyncio.start_server(lambda r, w: w.close(), "127.0.0.6", ssh))
+
+        print("=== Sweep 2 (deltas only) ===")
+        delta = await loop.run_in_executor(None, scanner.discover, "127.0.0.0/26")
+        for key in ("added", "changed", "gone"):
+            for host in delta[key]:
+                print(f"  {key}: {host['name']} ports={sorted(host['ports'])}")
+        print()
+
+        servers.append(await asyncio.start_server(lambda r, w: w.close(), "127.0.0.5", https))
+
+        print("=== Sweep 3 (127.0.0.5 back) ===")
+        delta = await loop.run_in_executor(None, scanner.discover, "127.0.0.0/26")
+        for key in ("added", "returned", "changed", "gone"):
+            for host in delta[key]:
+                print(f"  {key}: {host['name']} ports={sorted(host['ports'])}")
+
+        for server in servers:
+            server.close()
+
+    asyncio.run(run_sweeps())
+    print()
+    print(f"Monitoring {len(monitor.devices)} discovered devices:")
+    for device in monitor.devices:
+        print(f"  {device['name']} ({device['type']})")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("       NETWORK DISCOVERY SCANNER")
+    print("=" * 60)
+    print()
+    main()
+    print("\n" + "=" * 60)
+    print("           DEMO COMPLETE")
+    print("=" * 60)
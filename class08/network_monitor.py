@@ -2,47 +2,114 @@ import json
 import random
 from datetime import datetime
 
-print("=" * 60)
-print("       NETWORK MONITORING TOOL")
-print("=" * 60)
-print()
-
 
 class NetworkMonitor:
     """Monitors network devices and performance"""
     
-    def __init__(self):
+    def __init__(self, probe=None):
         self.devices = []
         self.alerts = []
         self.metrics_history = []
+        # Topology: parent -> child names, and open incidents per device
+        self.by_name = {}
+        self.children = {}
+        self.incidents = {}
+        # probe(device) -> latency in ms, or None if unreachable
+        self.probe = probe or self.simulated_probe
     
-    def add_device(self, name, ip, device_type):
-        """Add device to monitoring"""
-        self.devices.append({
+    def add_device(self, name, ip, device_type, parent=None):
+        """Add device to monitoring, optionally behind a parent device"""
+        suppressed_by = None
+        if parent is not None:
+            if parent not in self.by_name:
+                raise ValueError(f"Unknown parent device: {parent}")
+            parent_device = self.by_name[parent]
+            suppressed_by = parent_device.get("suppressed_by")
+            if suppressed_by is None and parent_device["status"] == "down":
+                suppressed_by = parent
+            self.children.setdefault(parent, []).append(name)
+        
+        device = {
             "name": name,
             "ip": ip,
             "type": device_type,
-            "status": "unknown",
-            "last_check": None
-        })
+            "status": "suppressed" if suppressed_by else "unknown",
+            "last_check": None,
+            "parent": parent,
+            "suppressed_by": suppressed_by
+        }
+        self.devices.append(device)
+        self.by_name[name] = device
+        if suppressed_by:
+            self.incidents[suppressed_by].append(name)
     
-    def check_device(self, device):
-        """Check device status (simulated)"""
-        # Simulate ping/health check
+    def _descendants(self, name):
+        """Yield every device below `name` in the topology"""
+        stack = list(self.children.get(name, []))
+        while stack:
+            child = stack.pop()
+            yield self.by_name[child]
+            stack.extend(self.children.get(child, []))
+    
+    def _open_incident(self, device):
+        """Fold everything behind a newly-down device into its incident"""
+        suppressed = []
+        for child in self._descendants(device["name"]):
+            child["suppressed_by"] = device["name"]
+            child["status"] = "suppressed"
+            self.incidents.pop(child["name"], None)
+            suppressed.append(child["name"])
+        self.incidents[device["name"]] = suppressed
+    
+    def _close_incident(self, device):
+        """Release devices behind a recovered device for re-probing"""
+        for child in self._descendants(device["name"]):
+            child["suppressed_by"] = None
+            child["status"] = "unknown"
+        self.incidents.pop(device["name"], None)
+    
+    def simulated_probe(self, device):
+        """Simulate ping/health check"""
         latency = random.randint(1, 50)
         is_up = random.random() > 0.1  # 90% uptime
+        return latency if is_up else None
+    
+    def check_device(self, device):
+        """Check device status"""
+        return self.record_result(device, self.probe(device))
+    
+    def record_result(self, device, latency):
+        """Update device status from a probe result (None means down)"""
+        is_up = latency is not None
+        was_down = device["status"] == "down"
         
-        device["status"] = "up" if is_up else "down"
-        device["latency"] = latency if is_up else None
+        device["latency"] = latency
         device["last_check"] = datetime.now().isoformat()
         
+        # Behind a down device: the upstream incident already covers it
+        if device.get("suppressed_by"):
+            return device
+        
+        device["status"] = "up" if is_up else "down"
+        
+        # Only status changes touch the topology, and only below this device
+        if not is_up and not was_down:
+            self._open_incident(device)
+        elif is_up and was_down:
+            self._close_incident(device)
+        
         # Generate alert if down
         if not is_up:
+            suppressed = list(self.incidents.get(device["name"], []))
+            message = f"{device['name']} is unreachable"
+            if suppressed:
+                message += f" ({len(suppressed)} dependent devices suppressed)"
             self.alerts.append({
                 "device": device["name"],
                 "type": "DOWN",
                 "timestamp": device["last_check"],
-                "message": f"{device['name']} is unreachable"
+                "message": message,
+                "suppressed_devices": suppressed
             })
         
         return device
@@ -51,8 +118,13 @@ class NetworkMonitor:
         """Check all devices"""
         print("=== Running Health Check ===")
         
+        # Parents are always added before their children, so an outage
+        # upstream is known before any device behind it would be probed
         for device in self.devices:
             print(f"Checking {device['name']} ({device['ip']})...", end=" ")
+            if device.get("suppressed_by"):
+                print(f"- SUPPRESSED ({device['suppressed_by']} down)")
+                continue
             self.check_device(device)
             
             if device["status"] == "up":
@@ -74,6 +146,7 @@ class NetworkMonitor:
         """Generate monitoring report"""
         up_count = sum(1 for d in self.devices if d["status"] == "up")
         down_count = sum(1 for d in self.devices if d["status"] == "down")
+        suppressed_count = sum(1 for d in self.devices if d["status"] == "suppressed")
         
         report = {
             "timestamp": datetime.now().isoformat(),
@@ -81,6 +154,7 @@ class NetworkMonitor:
                 "total_devices": len(self.devices),
                 "up": up_count,
                 "down": down_count,
+                "suppressed": suppressed_count,
                 "uptime_percentage": (up_count / len(self.devices) * 100) if self.devices else 0
             },
             "devices": self.devices,
@@ -96,16 +170,16 @@ def main():
     # Add devices to monitor
     print("=== Adding Devices ===")
     devices_to_add = [
-        ("router-main", "192.168.1.1", "router"),
-        ("switch-core", "192.168.1.2", "switch"),
-        ("firewall-edge", "192.168.1.3", "firewall"),
-        ("server-web01", "192.168.1.10", "server"),
-        ("server-db01", "192.168.1.20", "server"),
+        ("router-main", "192.168.1.1", "router", None),
+        ("switch-core", "192.168.1.2", "switch", "router-main"),
+        ("firewall-edge", "192.168.1.3", "firewall", "router-main"),
+        ("server-web01", "192.168.1.10", "server", "switch-core"),
+        ("server-db01", "192.168.1.20", "server", "switch-core"),
     ]
     
-    for name, ip, dtype in devices_to_add:
-        monitor.add_device(name, ip, dtype)
-        print(f"  Added: {name} ({ip})")
+    for name, ip, dtype, parent in devices_to_add:
+        monitor.add_device(name, ip, dtype, parent=parent)
+        print(f"  Added: {name} ({ip})" + (f" behind {parent}" if parent else ""))
     print()
     
     # Run health check
@@ -131,9 +205,23 @@ def main():
     print(f"Up: {report['summary']['up']}")
     print(f"Down: {report['summary']['down']}")
     print(f"Uptime: {report['summary']['uptime_percentage']:.1f}%")
+    print()
+    
+    # Simulate an outage of the main router
+    print("=== Router Outage ===")
+    monitor.clear_alerts()
+    monitor.probe = lambda device: None if device["name"] == "router-main" else 5
+    monitor.run_check()
+    for alert in monitor.get_alerts():
+        print(f"  ⚠ {alert['device']}: {alert['message']}")
+    print(f"Suppressed: {monitor.generate_report()['summary']['suppressed']}")
 
 
 if __name__ == "__main__":
+    print("=" * 60)
+    print("       NETWORK MONITORING TOOL")
+    print("=" * 60)
+    print()
     main()
     print("\n" + "=" * 60)
     print("           DEMO COMPLETE")
@@ -0,0 +1,268 @@
+import bisect
+import hashlib
+import multiprocessing
+import random
+from datetime import datetime
+from multiprocessing.connection import wait
+
+from network_monitor import NetworkMonitor
+
+
+class ConsistentHashRing:
+    """Maps device names to shards so adding a shard moves few devices"""
+
+    def __init__(self, nodes=(), replicas=100):
+        self.replicas = replicas
+        self._keys = []
+        self._ring = {}
+        for node in nodes:
+            self.add_node(node)
+
+    def _hash(self, key):
+        """Stable 64-bit hash (Python's hash() is salted per process)"""
+        return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+    def add_node(self, node):
+        """Place a node on the ring at several virtual points"""
+        for i in range(self.replicas):
+            point = self._hash(f"{node}#{i}")
+            self._ring[point] = node
+            bisect.insort(self._keys, point)
+
+    def remove_node(self, node):
+        """Take a node and all of its virtual points off the ring"""
+        for i in range(self.replicas):
+            point = self._hash(f"{node}#{i}")
+            del self._ring[point]
+            self._keys.remove(point)
+
+    def get_node(self, key):
+        """Return the node that owns a key"""
+        if not self._keys:
+            raise ValueError("Hash ring has no nodes")
+        idx = bisect.bisect(self._keys, self._hash(key)) % len(self._keys)
+        return self._ring[self._keys[idx]]
+
+
+def _shard_worker(shard_id, conn):
+    """Worker process: owns a NetworkMonitor for one shard of devices"""
+    random.seed()  # forked children inherit the parent's random state
+    monitor = NetworkMonitor()
+    by_name = {}
+
+    while True:
+        command, payload = conn.recv()
+
+        if command == "add":
+            monitor.devices.append(payload)
+            by_name[payload["name"]] = payload
+        elif command == "remove":
+            device = by_name.pop(payload, None)
+            if device is not None:
+                monitor.devices.remove(device)
+        elif command == "check":
+            # Only ship what changed since the last round
+            changes = []
+            for device in monitor.devices:
+                before = (device["status"], device.get("latency"))
+                monitor.check_device(device)
+                if (device["status"], device["latency"]) != before:
+                    changes.append((device["name"], device["status"], device["latency"]))
+            checked_at = monitor.devices[0]["last_check"] if monitor.devices else None
+            conn.send((shard_id, changes, monitor.alerts, checked_at))
+            monitor.clear_alerts()
+        elif command == "stop":
+            conn.close()
+            return
+
+
+class ShardedNetworkMonitor:
+    """Spreads devices across worker processes by consistent hashing"""
+
+    def __init__(self, num_workers=None, replicas=100):
+        self.replicas = replicas
+        self.ring = ConsistentHashRing(replicas=replicas)
+        self.workers = {}
+        # Coordinator keeps the authoritative copy of device state and
+        # alerts, so restarting or rebalancing a worker never loses them
+        self.devices = {}
+        self.owner = {}
+        self.members = {}
+        self.alerts = []
+
+        for shard_id in range(num_workers or multiprocessing.cpu_count()):
+            self.add_worker(f"shard-{shard_id}")
+
+    def _start_process(self, shard_id):
+        """Spawn one worker process connected by a pipe"""
+        parent_conn, child_conn = multiprocessing.Pipe()
+        process = multiprocessing.Process(
+            target=_shard_worker, args=(shard_id, child_conn), daemon=True
+        )
+        process.start()
+        child_conn.close()
+        self.workers[shard_id] = {"process": process, "conn": parent_conn}
+        self.members.setdefault(shard_id, set())
+
+    def _assign(self, name, shard_id):
+        """Hand a device's last known state to its owning worker"""
+        old_shard = self.owner.get(name)
+        if old_shard is not None:
+            self.members[old_shard].discard(name)
+        self.owner[name] = shard_id
+        self.members[shard_id].add(name)
+        self.workers[shard_id]["conn"].send(("add", dict(self.devices[name])))
+
+    def _rebalance(self):
+        """Move only the devices whose owner changed on the ring"""
+        moved = 0
+        for name, old_shard in list(self.owner.items()):
+            new_shard = self.ring.get_node(name)
+            if new_shard != old_shard:
+                if old_shard in self.workers:
+                    self.workers[old_shard]["conn"].send(("remove", name))
+                self._assign(name, new_shard)
+                moved += 1
+        return moved
+
+    def add_worker(self, shard_id):
+        """Add a worker process and rebalance; returns devices moved"""
+        self._start_process(shard_id)
+        self.ring.add_node(shard_id)
+        return self._rebalance()
+
+    def remove_worker(self, shard_id):
+        """Stop a worker process and move its devices elsewhere"""
+        self.ring.remove_node(shard_id)
+        worker = self.workers.pop(shard_id)
+        worker["conn"].send(("stop", None))
+        worker["process"].join(timeout=5)
+        moved = self._rebalance()
+        del self.members[shard_id]
+        return moved
+
+    def restart_worker(self, shard_id):
+        """Replace a (crashed or hung) worker, reloading its devices"""
+        worker = self.workers.pop(shard_id)
+        if worker["process"].is_alive():
+            worker["process"].terminate()
+        worker["process"].join(timeout=5)
+        self._start_process(shard_id)
+        for name in list(self.members[shard_id]):
+            self._assign(name, shard_id)
+
+    def add_device(self, name, ip, device_type):
+        """Add device to monitoring on its owning shard"""
+        self.devices[name] = {
+            "name": name,
+            "ip": ip,
+            "type": device_type,
+            "status": "unknown",
+            "last_check": None
+        }
+        self._assign(name, self.ring.get_node(name))
+
+    def run_check(self):
+        """Check all shards in parallel and merge their deltas"""
+        conns = {}
+        for shard_id, worker in self.workers.items():
+            worker["conn"].send(("check", None))
+            conns[worker["conn"]] = shard_id
+
+        while conns:
+            for conn in wait(list(conns)):
+                shard_id = conns.pop(conn)
+                try:
+                    _, changes, alerts, checked_at = conn.recv()
+                except EOFError:
+                    # Worker died mid-check; bring it back with its devices
+                    self.restart_worker(shard_id)
+                    continue
+                for name, status, latency in changes:
+                    self.devices[name]["status"] = status
+                    self.devices[name]["latency"] = latency
+                for name in self.members[shard_id]:
+                    self.devices[name]["last_check"] = checked_at
+                self.alerts.extend(alerts)
+
+        return list(self.devices.values())
+
+    def get_alerts(self):
+        """Get all alerts"""
+        return self.alerts
+
+    def clear_alerts(self):
+        """Clear all alerts"""
+        self.alerts = []
+
+    def generate_report(self):
+        """Generate the global monitoring report across all shards"""
+        devices = list(self.devices.values())
+        up_count = sum(1 for d in devices if d["status"] == "up")
+        down_count = sum(1 for d in devices if d["status"] == "down")
+
+        return {
+            "timestamp": datetime.now().isoformat(),
+            "summary": {
+                "total_devices": len(devices),
+                "up": up_count,
+                "down": down_count,
+                "uptime_percentage": (up_count / len(devices) * 100) if devices else 0
+            },
+            "shards": {
+                shard_id: len(self.members[shard_id]) for shard_id in self.workers
+            },
+            "devices": devices,
+            "alerts": self.alerts
+        }
+
+    def shutdown(self):
+        """Stop all worker processes"""
+        for shard_id in list(self.workers):
+            worker = self.workers.pop(shard_id)
+            worker["conn"].send(("stop", None))
+            worker["process"].join(timeout=5)
+
+
+def main():
+    monitor = ShardedNetworkMonitor(num_workers=4)
+
+    try:
+        print("=== Adding Devices ===")
+        for i in range(1000):
+            monitor.add_device(f"device-{i:04d}", f"10.0.{i // 256}.{i % 256}", "server")
+        print(f"  Added: {len(monitor.devices)} devices across {len(monitor.workers)} shards")
+        print()
+
+        print("=== Running Sharded Health Check ===")
+        monitor.run_check()
+        report = monitor.generate_report()
+        print(f"Up: {report['summary']['up']}  Down: {report['summary']['down']}")
+        print(f"Shard sizes: {report['shards']}")
+        print()
+
+        print("=== Rebalancing ===")
+        moved = monitor.add_worker("shard-4")
+        print(f"Added shard-4: moved {moved} of {len(monitor.devices)} devices")
+
+        alerts_before = len(monitor.get_alerts())
+        monitor.restart_worker("shard-0")
+        print(f"Restarted shard-0: alerts kept {len(monitor.get_alerts())}/{alerts_before}")
+
+        monitor.run_check()
+        report = monitor.generate_report()
+        print(f"Uptime: {report['summary']['uptime_percentage']:.1f}%")
+        print(f"Shard sizes: {report['shards']}")
+    finally:
+        monitor.shutdown()
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("       SHARDED NETWORK MONITORING")
+    print("=" * 60)
+    print()
+    main()
+    print("\n" + "=" * 60)
+    print("           DEMO COMPLETE")
+    print("=" * 60)
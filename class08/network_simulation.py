@@ -0,0 +1,228 @@
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from network_monitor import NetworkMonitor
+
+RESPONDER_PORT = 17000
+
+# Latency is (min, max) in ms; loss is the chance a probe gets no answer;
+# flapping responders alternate up/down every `flap_period` seconds
+PROFILES = {
+    "healthy": {"latency_ms": (1, 5), "loss": 0.0, "flap_period": None},
+    "slow": {"latency_ms": (20, 80), "loss": 0.0, "flap_period": None},
+    "lossy": {"latency_ms": (1, 10), "loss": 0.2, "flap_period": None},
+    "flapping": {"latency_ms": (1, 5), "loss": 0.0, "flap_period": 2.0},
+}
+DEFAULT_MIX = {"healthy": 0.7, "slow": 0.1, "lossy": 0.1, "flapping": 0.1}
+
+
+def _percentiles(values):
+    """p50/p95/max summary of a list of numbers"""
+    if not values:
+        return {"p50": None, "p95": None, "max": None}
+    ordered = sorted(values)
+    return {
+        "p50": round(ordered[len(ordered) // 2], 3),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        "max": round(ordered[-1], 3),
+    }
+
+
+class FakeResponder:
+    """One loopback listener that answers probes with a one-byte banner"""
+
+    def __init__(self, ip, profile, started):
+        self.ip = ip
+        self.profile = profile
+        self.started = started
+        # Stagger flapping devices so they don't all go down together
+        self.phase = random.uniform(0, profile["flap_period"] or 0)
+        self.server = None
+
+    def is_down(self, now=None):
+        """Whether a flapping responder is in its down half-period"""
+        period = self.profile["flap_period"]
+        if not period:
+            return False
+        elapsed = (now or time.time()) - self.started + self.phase
+        return int(elapsed / period) % 2 == 1
+
+    def down_transitions(self, until):
+        """Wall-clock times this responder went down before `until`"""
+        period = self.profile["flap_period"]
+        if not period:
+            return []
+        first = self.started - self.phase + period
+        return [t for t in (first + 2 * k * period for k in range(int((until - first) / period) + 1))
+                if self.started <= t < until]
+
+    async def handle(self, reader, writer):
+        """Answer after the profile's latency, or drop the connection"""
+        if not self.is_down() and random.random() >= self.profile["loss"]:
+            low, high = self.profile["latency_ms"]
+            await asyncio.sleep(random.uniform(low, high) / 1000)
+            writer.write(b"+")
+            try:
+                await writer.drain()
+            except ConnectionError:
+                pass
+        writer.close()
+
+    async def start(self):
+        """Bind the listener"""
+        self.server = await asyncio.start_server(self.handle, self.ip, RESPONDER_PORT)
+
+
+async def tcp_probe(ip, port, timeout):
+    """Connect and wait for the banner; returns latency in ms or None"""
+    started = time.perf_counter()
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(ip, port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return None
+    try:
+        await asyncio.wait_for(reader.readexactly(1), timeout)
+        return round((time.perf_counter() - started) * 1000, 3)
+    except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+        return None
+    finally:
+        writer.close()
+
+
+def measure_memory_per_device(num_devices):
+    """Bytes of NetworkMonitor state per device after one check round"""
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    monitor = NetworkMonitor()
+    for i in range(num_devices):
+        monitor.add_device(f"device-{i:05d}", f"127.1.{i // 250}.{i % 250 + 1}", "server")
+    for device in monitor.devices:
+        monitor.record_result(device, 1.0)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (after - before) / num_devices
+
+
+async def run_simulation(num_devices=2000, rounds=5, interval=1.0,
+                         concurrency=500, timeout=1.0, mix=None, seed=None):
+    """Start the responder fleet, drive NetworkMonitor, return metrics"""
+    random.seed(seed)
+    mix = mix or DEFAULT_MIX
+    started = time.time()
+
+    profile_names = random.choices(list(mix), weights=list(mix.values()), k=num_devices)
+    responders = [
+        FakeResponder(f"127.1.{i // 250}.{i % 250 + 1}", PROFILES[name], started)
+        for i, name in enumerate(profile_names)
+    ]
+    await asyncio.gather(*(r.start() for r in responders))
+
+    monitor = NetworkMonitor()
+    for i, (responder, name) in enumerate(zip(responders, profile_names)):
+        monitor.add_device(f"{name}-{i:05d}", responder.ip, name)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    lags = []
+    latencies = []
+
+    async def check(device, scheduled):
+        async with semaphore:
+            lags.append((time.monotonic() - scheduled) * 1000)
+            latency = await tcp_probe(device["ip"], RESPONDER_PORT, timeout)
+            monitor.record_result(device, latency)
+            if latency is not None:
+                latencies.append(latency)
+
+    run_started = time.monotonic()
+    for k in range(rounds):
+        scheduled = run_started + k * interval
+        await asyncio.sleep(max(0, scheduled - time.monotonic()))
+        await asyncio.gather(*(check(device, scheduled) for device in monitor.devices))
+    elapsed = time.monotonic() - run_started
+    finished = time.time()
+
+    for responder in responders:
+        responder.server.close()
+
+    # Alert latency: first DOWN alert after each scheduled down transition
+    alerts_by_device = {}
+    for alert in monitor.get_alerts():
+        alerts_by_device.setdefault(alert["device"], []).append(
+            datetime.fromisoformat(alert["timestamp"]).timestamp()
+        )
+    alert_latencies = []
+    for device, responder in zip(monitor.devices, responders):
+        for went_down in responder.down_transitions(finished):
+            raised = [t for t in alerts_by_device.get(device["name"], []) if t >= went_down]
+            if raised:
+                alert_latencies.append((min(raised) - went_down) * 1000)
+
+    report = monitor.generate_report()
+    probes = num_devices * rounds
+    return {
+        "probes": probes,
+        "elapsed_seconds": round(elapsed, 3),
+        "probe_throughput_per_s": round(probes / elapsed, 1),
+        "probe_latency_ms": _percentiles(latencies),
+        "schedule_lag_ms": _percentiles(lags),
+        "alert_latency_ms": _percentiles(alert_latencies),
+        "down_alerts": len(monitor.get_alerts()),
+        "final_uptime_percentage": round(report["summary"]["uptime_percentage"], 2),
+        "profiles": {name: profile_names.count(name) for name in mix},
+    }
+
+
+def _git_revision():
+    """Current commit, so results can be tracked across releases"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NetworkMonitor simulation benchmark")
+    parser.add_argument("--devices", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--interval", type=float, default=1.0)
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--timeout", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_simulation(
+        num_devices=args.devices, rounds=args.rounds, interval=args.interval,
+        concurrency=args.concurrency, timeout=args.timeout, seed=args.seed
+    ))
+    results["memory_per_device_bytes"] = round(measure_memory_per_device(args.devices))
+
+    output = {
+        "benchmark": "network_monitor_simulation",
+        "timestamp": datetime.now().isoformat(),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "config": vars(args),
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(output, f, indent=2)
+        print(f"Results written to {args.output}", file=sys.stderr)
+    else:
+        print(json.dumps(output, indent=2))
+
+
+if __name__ == "__main__":
+    main()
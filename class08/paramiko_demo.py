@@ -1,64 +1,195 @@
+import hashlib
+import heapq
+import os
+import random
+import re
+import shutil
+import socket
+import tempfile
+import threading
 import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
 from datetime import datetime
 
+from inventory import Inventory
+
 print("=" * 60)
 print("           SSH AUTOMATION WITH PARAMIKO")
 print("=" * 60)
 print()
 
 # Mock SSH Client for demonstration
+class MockTransport:
+    """Mock of paramiko's Transport (keepalive / liveness only)"""
+    
+    def __init__(self, client):
+        self.client = client
+        self.keepalive_interval = 0
+    
+    def is_active(self):
+        return self.client.connected
+    
+    def set_keepalive(self, interval):
+        self.keepalive_interval = interval
+    
+    def send_ignore(self):
+        """Keepalive packet; fails on a dead connection"""
+        if not self.client.connected:
+            raise EOFError("connection closed")
+
+
+class MockChannel:
+    """Mock of paramiko's Channel (exit status only)"""
+    
+    def __init__(self, status=0):
+        self.status = status
+        self.timeout = None
+    
+    def recv_exit_status(self):
+        return self.status
+    
+    def settimeout(self, timeout):
+        self.timeout = timeout
+
+
+class MockStdin:
+    def write(self, data): pass
+    def flush(self): pass
+
+
+class MockOutput:
+    def __init__(self, data, status=0):
+        self._data = data.encode()
+        self.channel = MockChannel(status)
+    def feed(self, data):
+        self._data += data.encode()
+    def read(self):
+        data, self._data = self._data, b""
+        return data
+    def readline(self):
+        # Like paramiko's ChannelFile: read() gives bytes, readline() text
+        line, sep, rest = self._data.partition(b"\n")
+        self._data = rest
+        return (line + sep).decode()
+    def readlines(self):
+        return [line for line in self.read().split(b'\n') if line]
+
+
+class MockShellStdin:
+    """stdin of a mock `/bin/sh -s`: each flush runs the buffered lines"""
+    
+    def __init__(self, client, stdout, stderr):
+        self.client = client
+        self.stdout = stdout
+        self.stderr = stderr
+        self.buffer = ""
+        self.status = 0
+    
+    def write(self, data):
+        self.buffer += data
+    
+    def flush(self):
+        script, _, self.buffer = self.buffer.rpartition("\n")
+        if script:
+            time.sleep(self.client.exec_latency)
+            self.client.round_trips += 1
+            out, err, self.status = self.client.run_script(script, self.status)
+            self.stdout.feed(out)
+            self.stderr.feed(err)
+    
+    def close(self):
+        self.buffer = ""
+
+
 class MockSSHClient:
     """Mock SSH client for demonstration"""
     
-    def __init__(self):
+    connect_count = 0  # connections opened by all clients
+    
+    def __init__(self, connect_latency=0.5, exec_latency=0.3, verbose=True):
         self.connected = False
         self.hostname = None
         self.username = None
+        self.connect_latency = connect_latency
+        self.exec_latency = exec_latency
+        self.verbose = verbose
+        self.transport = MockTransport(self)
+        self.round_trips = 0
     
     def connect(self, hostname, username, password=None, key_filename=None, timeout=30):
         """Simulate SSH connection"""
-        print(f"Connecting to {hostname}...")
-        time.sleep(0.5)
+        if self.verbose:
+            print(f"Connecting to {hostname}...")
+        if self.connect_latency > timeout:
+            time.sleep(timeout)
+            raise socket.timeout(f"timed out connecting to {hostname}")
+        time.sleep(self.connect_latency)
+        MockSSHClient.connect_count += 1
         self.connected = True
         self.hostname = hostname
         self.username = username
-        print(f"Connected as {username}@{hostname}")
+        if self.verbose:
+            print(f"Connected as {username}@{hostname}")
+    
+    def get_transport(self):
+        return self.transport
     
     def exec_command(self, command, timeout=30):
-        """Simulate command execution"""
-        print(f"Executing: {command}")
-        time.sleep(0.3)
+        """Simulate command execution (one command or a multi-line script)"""
+        if self.verbose:
+            print(f"Executing: {command}")
+        if self.exec_latency > timeout:
+            time.sleep(timeout)
+            raise socket.timeout(f"timed out running {command!r}")
+        time.sleep(self.exec_latency)
+        self.round_trips += 1
+        
+        if command == "/bin/sh -s":
+            # Long-lived shell: scripts written to stdin run on flush
+            stdout, stderr = MockOutput(""), MockOutput("")
+            return MockShellStdin(self, stdout, stderr), stdout, stderr
         
-        # Simulated outputs
+        stdout_data, stderr_data, status = self.run_script(command)
+        return MockStdin(), MockOutput(stdout_data, status), MockOutput(stderr_data, status)
+    
+    def run_command(self, command, last_status=0):
+        """Simulated (stdout, stderr, exit status) of a single command"""
         outputs = {
-            "hostname": (f"{self.hostname}\n", ""),
-            "uptime": ("10:30:00 up 45 days, 3:22, 2 users, load average: 0.15, 0.10, 0.05\n", ""),
-            "df -h": ("Filesystem      Size  Used Avail Use% Mounted on\n/dev/sda1       100G   45G   55G  45% /\n", ""),
-            "free -h": ("              total        used        free\nMem:           16G         8G         8G\n", ""),
-            "cat /etc/os-release": ('NAME="Ubuntu"\nVERSION="22.04 LTS"\n', ""),
+            "hostname": f"{self.hostname}\n",
+            "uptime": "10:30:00 up 45 days, 3:22, 2 users, load average: 0.15, 0.10, 0.05\n",
+            "df -h": "Filesystem      Size  Used Avail Use% Mounted on\n/dev/sda1       100G   45G   55G  45% /\n",
+            "free -h": "              total        used        free\nMem:           16G         8G         8G\n",
+            "cat /etc/os-release": 'NAME="Ubuntu"\nVERSION="22.04 LTS"\n',
         }
-        
-        stdout_data = outputs.get(command, (f"Output of: {command}\n", ""))[0]
-        stderr_data = outputs.get(command, ("", ""))[1]
-        
-        class MockStdin:
-            def write(self, data): pass
-            def flush(self): pass
-        
-        class MockOutput:
-            def __init__(self, data):
-                self._data = data
-            def read(self):
-                return self._data.encode()
-            def readlines(self):
-                return [line.encode() for line in self._data.split('\n') if line]
-        
-        return MockStdin(), MockOutput(stdout_data), MockOutput(stderr_data)
+        command = command.removesuffix(" </dev/null")
+        if command.startswith("echo ") and command.endswith(" >&2"):
+            return "", command[5:-4].strip("'\"") + "\n", 0
+        if command.startswith("echo "):
+            return command[5:].strip("'\"").replace("$?", str(last_status)) + "\n", "", 0
+        if command == "false":
+            return "", "", 1
+        if command.startswith("missing-"):
+            return "", f"sh: 1: {command}: not found\n", 127
+        return outputs.get(command, f"Output of: {command}\n"), "", 0
+    
+    def run_script(self, script, status=0):
+        """Run a script line by line, like `sh`: (stdout, stderr, last status)"""
+        stdout, stderr = [], []
+        for line in script.splitlines():
+            line = line.strip()
+            if line:
+                out, err, status = self.run_command(line, status)
+                stdout.append(out)
+                stderr.append(err)
+        return "".join(stdout), "".join(stderr), status
     
     def close(self):
         """Close connection"""
         self.connected = False
-        print(f"Disconnected from {self.hostname}")
+        if self.verbose:
+            print(f"Disconnected from {self.hostname}")
 
 
 # ===== 1. BASIC CONNECTION =====
@@ -134,18 +265,17 @@ servers = [
     {"host": "192.168.1.20", "user": "admin", "type": "db"},
 ]
 
-def run_on_servers(servers, command):
-    """Execute command on multiple servers"""
+def run_on_servers(servers, command, pool=None):
+    """Execute command on multiple servers (reusing pooled connections if given)"""
     results = []
     
     for server in servers:
         print(f"\nConnecting to {server['host']}...")
-        ssh = MockSSHClient()
         
         try:
-            ssh.connect(server['host'], server['user'], password="password")
-            stdin, stdout, stderr = ssh.exec_command(command)
-            output = stdout.read().decode().strip()
+            with connect_to(server, pool) as ssh:
+                stdin, stdout, stderr = ssh.exec_command(command)
+                output = stdout.read().decode().strip()
             
             results.append({
                 "host": server['host'],
@@ -160,11 +290,24 @@ def run_on_servers(servers, command):
                 "error": str(e),
                 "success": False
             })
-        finally:
-            ssh.close()
     
     return results
 
+
+@contextmanager
+def connect_to(server, pool=None):
+    """A connected client for a server: pooled, or opened and closed here"""
+    if pool is not None:
+        with pool.connection(server['host'], server['user'], password="password") as ssh:
+            yield ssh
+        return
+    ssh = MockSSHClient()
+    try:
+        ssh.connect(server['host'], server['user'], password="password")
+        yield ssh
+    finally:
+        ssh.close()
+
 results = run_on_servers(servers, "uptime")
 print("\n=== Results Summary ===")
 for r in results:
@@ -172,6 +315,1064 @@ for r in results:
     print(f"{status} {r['host']} ({r['type']}): {r.get('output', r.get('error', 'N/A'))[:50]}")
 print()
 
+# ===== 5. CONNECTION POOL =====
+print("=== 5. Connection Pool ===")
+
+class SSHConnectionPool:
+    """Reuse live SSH sessions keyed by (host, user, auth)"""
+    
+    def __init__(self, client_factory=MockSSHClient, per_host=4, max_total=64,
+                 idle_ttl=300, keepalive_interval=30):
+        self.client_factory = client_factory
+        self.per_host = per_host
+        self.max_total = max_total
+        self.idle_ttl = idle_ttl
+        self.keepalive_interval = keepalive_interval
+        self.cond = threading.Condition()
+        self.idle = {}      # key -> [(client, last_used)], most recent last
+        self.per_host_open = {}
+        self.total_open = 0
+        self.last_maintenance = time.monotonic()
+        self.stats = {"connects": 0, "reuses": 0, "evicted": 0, "keepalives": 0, "dead": 0}
+    
+    @staticmethod
+    def make_key(host, user, password=None, key_filename=None):
+        """Pool key; the password is only kept as a hash"""
+        if key_filename:
+            auth = f"key:{key_filename}"
+        else:
+            auth = "pw:" + hashlib.sha256((password or "").encode()).hexdigest()[:16]
+        return (host, user, auth)
+    
+    def _drop(self, key, client):
+        """Close a connection and free its slot (lock held)"""
+        client.close()
+        self.per_host_open[key[0]] -= 1
+        self.total_open -= 1
+        self.cond.notify_all()
+    
+    def maintain(self, force=False):
+        """Evict idle sessions past the TTL and keepalive the others"""
+        with self.cond:
+            now = time.monotonic()
+            if not force and now - self.last_maintenance < min(self.keepalive_interval, self.idle_ttl):
+                return
+            self.last_maintenance = now
+            for key, sessions in self.idle.items():
+                alive = []
+                for client, last_used in sessions:
+                    if now - last_used > self.idle_ttl:
+                        self.stats["evicted"] += 1
+                        self._drop(key, client)
+                        continue
+                    try:
+                        client.get_transport().send_ignore()
+                        self.stats["keepalives"] += 1
+                        alive.append((client, last_used))
+                    except (EOFError, OSError):
+                        self.stats["dead"] += 1
+                        self._drop(key, client)
+                sessions[:] = alive
+    
+    def _evict_oldest_idle(self, host=None):
+        """Close the least recently used idle session, optionally on one host (lock held)"""
+        oldest = None
+        for key, sessions in self.idle.items():
+            if host is not None and key[0] != host:
+                continue
+            if sessions and (oldest is None or sessions[0][1] < oldest[2]):
+                oldest = (key, sessions[0][0], sessions[0][1])
+        if oldest is None:
+            return False
+        key, client, _ = oldest
+        self.idle[key].pop(0)
+        self.stats["evicted"] += 1
+        self._drop(key, client)
+        return True
+    
+    def acquire(self, host, user, password=None, key_filename=None, timeout=30):
+        """A connected client from the pool, connecting only if needed"""
+        self.maintain()
+        key = self.make_key(host, user, password, key_filename)
+        deadline = time.monotonic() + timeout
+        with self.cond:
+            while True:
+                sessions = self.idle.get(key)
+                while sessions:
+                    client, _ = sessions.pop()
+                    if client.get_transport().is_active():
+                        self.stats["reuses"] += 1
+                        return key, client
+                    self.stats["dead"] += 1
+                    self._drop(key, client)
+                
+                host_open = self.per_host_open.get(host, 0)
+                # Host is full: an idle session for another user/auth gives way
+                if host_open >= self.per_host and self._evict_oldest_idle(host):
+                    host_open -= 1
+                if host_open < self.per_host:
+                    if self.total_open < self.max_total or self._evict_oldest_idle():
+                        self.per_host_open[host] = host_open + 1
+                        self.total_open += 1
+                        break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"no free connection slot for {host}")
+                self.cond.wait(remaining)
+        
+        client = self.client_factory()
+        try:
+            client.connect(host, user, password=password, key_filename=key_filename, timeout=timeout)
+            client.get_transport().set_keepalive(self.keepalive_interval)
+        except Exception:
+            with self.cond:
+                self.per_host_open[host] -= 1
+                self.total_open -= 1
+                self.cond.notify_all()
+            raise
+        with self.cond:
+            self.stats["connects"] += 1
+        return key, client
+    
+    def release(self, key, client, broken=False):
+        """Return a client to the pool (or close it if it failed)"""
+        with self.cond:
+            if broken or not client.get_transport().is_active():
+                self._drop(key, client)
+            else:
+                self.idle.setdefault(key, []).append((client, time.monotonic()))
+                self.cond.notify_all()
+    
+    @contextmanager
+    def connection(self, host, user, password=None, key_filename=None, timeout=30):
+        """with pool.connection(host, user, ...) as ssh: ..."""
+        key, client = self.acquire(host, user, password, key_filename, timeout)
+        broken = False
+        try:
+            yield client
+        except Exception:
+            broken = True
+            raise
+        finally:
+            self.release(key, client, broken)
+    
+    def close_all(self):
+        """Close every idle connection"""
+        with self.cond:
+            for key, sessions in self.idle.items():
+                for client, _ in sessions:
+                    self._drop(key, client)
+            self.idle.clear()
+
+
+def fast_client():
+    """Mock client with injected latency, quiet so the timing shows"""
+    return MockSSHClient(connect_latency=0.2, exec_latency=0.02, verbose=False)
+
+rounds = [["hostname", "uptime"], ["df -h", "free -h"], ["cat /etc/os-release"]]
+
+MockSSHClient.connect_count = 0
+start = time.perf_counter()
+for commands in rounds:
+    for server in servers:
+        for cmd in commands:
+            ssh = fast_client()
+            ssh.connect(server['host'], server['user'], password="password")
+            ssh.exec_command(cmd)
+            ssh.close()
+unpooled = (MockSSHClient.connect_count, time.perf_counter() - start)
+
+MockSSHClient.connect_count = 0
+pool = SSHConnectionPool(client_factory=fast_client, per_host=2, max_total=10, idle_ttl=60)
+start = time.perf_counter()
+for commands in rounds:
+    for server in servers:
+        for cmd in commands:
+            with pool.connection(server['host'], server['user'], password="password") as ssh:
+                ssh.exec_command(cmd)
+pooled = (MockSSHClient.connect_count, time.perf_counter() - start)
+
+print(f"Without pool: {unpooled[0]} connects in {unpooled[1]:.2f}s")
+print(f"With pool:    {pooled[0]} connects in {pooled[1]:.2f}s "
+      f"({unpooled[0] - pooled[0]} reconnects saved, stats {pool.stats})")
+
+# Pooled connections also carry over between run_on_servers() calls
+results = run_on_servers(servers, "hostname", pool=pool)
+print(f"run_on_servers with pool: {sum(r['success'] for r in results)}/{len(results)} ok, "
+      f"total connects still {MockSSHClient.connect_count}")
+pool.close_all()
+print()
+
+# ===== 6. PARALLEL FAN-OUT =====
+print("=== 6. Parallel Fan-Out Execution ===")
+
+def _run_one(server, command, pool, client_factory, connect_timeout, command_timeout):
+    """Worker: run one command on one server, timing connect and exec"""
+    result = {"host": server['host'], "type": server.get('type')}
+    started = time.perf_counter()
+    connected = started
+    try:
+        if pool is not None:
+            key, ssh = pool.acquire(server['host'], server['user'], password="password", timeout=connect_timeout)
+        else:
+            key, ssh = None, client_factory()
+            ssh.connect(server['host'], server['user'], password="password", timeout=connect_timeout)
+        connected = time.perf_counter()
+        broken = True
+        try:
+            stdin, stdout, stderr = ssh.exec_command(command, timeout=command_timeout)
+            result.update(output=stdout.read().decode().strip(), success=True)
+            broken = False
+        finally:
+            if pool is not None:
+                pool.release(key, ssh, broken)
+            else:
+                ssh.close()
+    except Exception as e:
+        result.update(error=str(e) or type(e).__name__, success=False)
+    finished = time.perf_counter()
+    result["latency"] = {
+        "connect": round(connected - started, 4),
+        "command": round(finished - connected, 4) if result["success"] else None,
+        "total": round(finished - started, 4)
+    }
+    return result
+
+
+def iter_run_on_servers(servers, command, pool=None, client_factory=MockSSHClient, workers=32,
+                        connect_timeout=10, command_timeout=30):
+    """Run a command on many servers at once, yielding results as they finish
+    
+    Results have the run_on_servers() format plus per-host "latency".
+    A host that outlives connect_timeout + command_timeout is reported
+    as timed out even if its worker thread is still stuck.
+    """
+    deadline_for = {}
+    executor = ThreadPoolExecutor(max_workers=workers)
+    
+    def task(server):
+        deadline_for[server['host']] = time.monotonic() + connect_timeout + command_timeout
+        return _run_one(server, command, pool, client_factory, connect_timeout, command_timeout)
+    
+    pending = {executor.submit(task, server): server for server in servers}
+    try:
+        while pending:
+            done, _ = wait(pending, timeout=0.05, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.pop(future)
+                yield future.result()
+            now = time.monotonic()
+            for future, server in list(pending.items()):
+                if deadline_for.get(server['host'], now + 1) < now:
+                    pending.pop(future)
+                    yield {"host": server['host'], "type": server.get('type'), "error": "deadline exceeded",
+                           "success": False, "latency": {"connect": None, "command": None,
+                                                         "total": connect_timeout + command_timeout}}
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def run_on_servers_parallel(servers, command, **options):
+    """Parallel run_on_servers(): same result list, in input order"""
+    by_host = {r['host']: r for r in iter_run_on_servers(servers, command, **options)}
+    return [by_host[server['host']] for server in servers]
+
+
+class SimulatedHostClient(MockSSHClient):
+    """Quiet mock client whose latency depends on the host"""
+    
+    profiles = {}  # host -> (connect_latency, exec_latency)
+    
+    def __init__(self):
+        super().__init__(verbose=False)
+    
+    def connect(self, hostname, username, password=None, key_filename=None, timeout=30):
+        self.connect_latency, self.exec_latency = self.profiles.get(hostname, (0.1, 0.05))
+        super().connect(hostname, username, password=password, key_filename=key_filename, timeout=timeout)
+
+
+rng = random.Random(42)
+fleet = [{"host": f"10.0.{i // 250}.{i % 250 + 1}", "user": "admin", "type": "web" if i % 4 else "db"}
+         for i in range(500)]
+for server in fleet:
+    SimulatedHostClient.profiles[server['host']] = (rng.uniform(0.05, 0.2), rng.uniform(0.02, 0.1))
+for server in fleet[::100]:
+    SimulatedHostClient.profiles[server['host']] = (60.0, 0.05)  # unreachable: hangs on connect
+
+sequential_estimate = sum(min(c, 2.0) + e for c, e in SimulatedHostClient.profiles.values())
+start = time.perf_counter()
+completed = 0
+latencies = []
+for result in iter_run_on_servers(fleet, "uptime", client_factory=SimulatedHostClient, workers=100,
+                                  connect_timeout=2.0, command_timeout=5.0):
+    completed += 1
+    if result['success']:
+        latencies.append(result['latency']['total'])
+    if completed in (1, 100, 250):
+        print(f"  {completed:>3} results streamed after {time.perf_counter() - start:.2f}s")
+elapsed = time.perf_counter() - start
+latencies.sort()
+print(f"500 hosts: {len(latencies)} ok, {completed - len(latencies)} failed in {elapsed:.2f}s "
+      f"(sequential would take ~{sequential_estimate:.0f}s)")
+print(f"Per-host latency p50 {latencies[len(latencies) // 2]:.3f}s, max {latencies[-1]:.3f}s")
+
+results = run_on_servers_parallel(servers, "uptime", client_factory=SimulatedHostClient)
+print(f"Compatible results: {[(r['host'], r['success']) for r in results]}")
+print()
+
+# ===== 7. COMMAND BATCHING =====
+print("=== 7. Command Batching ===")
+
+def build_batch_script(commands, marker):
+    """One script running every command between BEGIN/END markers
+    
+    The markers go to both stdout and stderr, so each stream splits back
+    per command; the stdout END line carries the exit code ($?). Commands
+    get /dev/null as stdin, so one that reads stdin can't swallow the
+    rest of a script fed to `sh -s`.
+    """
+    lines = []
+    for i, command in enumerate(commands):
+        lines.append(f"echo '{marker} BEGIN {i}'")
+        lines.append(f"echo '{marker} BEGIN {i}' >&2")
+        lines.append(f"{command} </dev/null")
+        lines.append(f'echo "{marker} END {i} $?"')
+        lines.append(f"echo '{marker} END {i}' >&2")
+    return "\n".join(lines) + "\n"
+
+
+def parse_batch_output(output, marker, commands, errors=""):
+    """Split batched stdout/stderr back into per-command results"""
+    pattern = re.compile(rf"{marker} BEGIN (\d+)\n(.*?)\n?{marker} END \1 (\d+)\n", re.S)
+    error_pattern = re.compile(rf"{marker} BEGIN (\d+)\n(.*?)\n?{marker} END \1\n", re.S)
+    results = [{"command": command, "output": None, "stderr": None, "exit_code": None}
+               for command in commands]
+    for match in pattern.finditer(output):
+        index = int(match.group(1))
+        results[index]["output"] = match.group(2)
+        results[index]["exit_code"] = int(match.group(3))
+    for match in error_pattern.finditer(errors):
+        results[int(match.group(1))]["stderr"] = match.group(2)
+    return results
+
+
+def exec_batch(ssh, commands, timeout=30):
+    """Run several commands in one exec_command round trip"""
+    marker = f"__BATCH_{uuid.uuid4().hex}__"  # unguessable, so output can't fake a boundary
+    stdin, stdout, stderr = ssh.exec_command(build_batch_script(commands, marker), timeout=timeout)
+    return parse_batch_output(stdout.read().decode(), marker, commands, stderr.read().decode())
+
+
+class PersistentShell:
+    """A long-lived `/bin/sh -s` on a connection, fed batches over stdin"""
+    
+    def __init__(self, ssh, timeout=30):
+        self.ssh = ssh
+        self.timeout = timeout
+        self.stdin, self.stdout, self.stderr = ssh.exec_command("/bin/sh -s")
+        self.closed = False
+    
+    def run(self, commands, timeout=None):
+        """Run a batch; reads output up to the last command's END marker"""
+        marker = f"__BATCH_{uuid.uuid4().hex}__"
+        deadline = time.monotonic() + (timeout or self.timeout)
+        self.stdin.write(build_batch_script(commands, marker))
+        self.stdin.flush()
+        last_end = f"{marker} END {len(commands) - 1}"
+        output = self._read_until(self.stdout, last_end + " ", deadline)
+        errors = self._read_until(self.stderr, last_end + "\n", deadline)
+        return parse_batch_output(output, marker, commands, errors)
+    
+    def _read_until(self, stream, end, deadline):
+        """Lines of one stream up to and including the line containing `end`
+        
+        Past the deadline the shell is marked broken and TimeoutError is
+        raised, which also makes a pool drop the connection.
+        """
+        lines = []
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    raise socket.timeout()
+                stream.channel.settimeout(remaining)
+                line = stream.readline()
+            except socket.timeout:
+                self.close()
+                raise TimeoutError("remote shell batch timed out") from None
+            if not line:
+                self.closed = True
+                raise EOFError("remote shell exited")
+            lines.append(line)
+            if end in line and line.endswith("\n"):
+                return "".join(lines)
+    
+    def close(self):
+        self.stdin.close()
+        self.closed = True
+
+
+def pooled_shell(ssh):
+    """The persistent shell kept on a (pooled) connection, started on first use"""
+    shell = getattr(ssh, "batch_shell", None)
+    if shell is None or shell.closed:
+        shell = ssh.batch_shell = PersistentShell(ssh)
+    return shell
+
+
+fact_commands = ["hostname", "uptime", "df -h", "free -h", "cat /etc/os-release", "missing-tool --version"]
+
+ssh = MockSSHClient(connect_latency=0.1, exec_latency=0.1, verbose=False)
+ssh.connect("192.168.1.10", "admin", password="password")
+start = time.perf_counter()
+for cmd in fact_commands:
+    ssh.exec_command(cmd)
+print(f"One exec per command: {ssh.round_trips} round trips in {time.perf_counter() - start:.2f}s")
+
+ssh.round_trips = 0
+start = time.perf_counter()
+batch = exec_batch(ssh, fact_commands)
+print(f"Batched exec:         {ssh.round_trips} round trip in {time.perf_counter() - start:.2f}s")
+for r in batch:
+    print(f"  [{r['exit_code']:>3}] {r['command']}: {(r['output'] or r['stderr'] or '').splitlines()[:1]}")
+
+pool = SSHConnectionPool(client_factory=lambda: MockSSHClient(connect_latency=0.1, exec_latency=0.1,
+                                                              verbose=False))
+for _ in range(3):
+    with pool.connection("192.168.1.10", "admin", password="password") as pooled:
+        results = pooled_shell(pooled).run(fact_commands)
+print(f"Persistent shell on pooled connection: 3 batches, {pooled.round_trips} round trips "
+      f"(1 to start the shell), {pool.stats['connects']} connect")
+pool.close_all()
+ssh.close()
+print()
+
+# ===== 8. CACHED FACT GATHERING =====
+print("=== 8. Cached Fact Gathering ===")
+
+FACT_COMMANDS = {
+    "hostname": "hostname",
+    "uptime": "uptime",
+    "disk": "df -h",
+    "memory": "free -h",
+    "os": "cat /etc/os-release",
+}
+# Seconds each fact stays fresh: the OS hardly changes, uptime/load always does
+FACT_TTLS = {"hostname": 3600, "uptime": 5, "disk": 300, "memory": 60, "os": 86400}
+SIZE_UNITS = {"": 1, "B": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+
+def parse_size(text):
+    """'16G' / '45.5M' -> bytes"""
+    match = re.match(r"([\d.]+)\s*([BKMGT]?)i?B?$", text.strip(), re.I)
+    if not match:
+        return None
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2).upper()])
+
+
+def parse_uptime(output):
+    """uptime -> {"days", "users", "load"}"""
+    days = re.search(r"up\s+(\d+)\s+day", output)
+    users = re.search(r"(\d+)\s+users?", output)
+    load = re.search(r"load average:\s*([\d.]+),\s*([\d.]+),\s*([\d.]+)", output)
+    return {
+        "days": int(days.group(1)) if days else 0,
+        "users": int(users.group(1)) if users else 0,
+        "load": tuple(float(x) for x in load.groups()) if load else None
+    }
+
+
+def parse_df(output):
+    """df -h -> [{"filesystem", "size", "used", "avail", "use_percent", "mount"}]"""
+    filesystems = []
+    for line in output.splitlines()[1:]:
+        fields = line.split()
+        # Pseudo filesystems report "-" for use%
+        if len(fields) >= 6 and fields[4].rstrip("%").isdigit():
+            filesystems.append({
+                "filesystem": fields[0],
+                "size": parse_size(fields[1]),
+                "used": parse_size(fields[2]),
+                "avail": parse_size(fields[3]),
+                "use_percent": int(fields[4].rstrip("%")),
+                "mount": fields[5]
+            })
+    return filesystems
+
+
+def parse_free(output):
+    """free -h -> {"total", "used", "free"} in bytes for main memory"""
+    lines = output.splitlines()
+    header = lines[0].split() if lines else []
+    for line in lines[1:]:
+        if line.startswith("Mem:"):
+            return {name: parse_size(value) for name, value in zip(header, line.split()[1:])}
+    return {}
+
+
+def parse_os_release(output):
+    """/etc/os-release -> {KEY: value}"""
+    release = {}
+    for line in output.splitlines():
+        key, sep, value = line.partition("=")
+        if sep:
+            release[key.strip()] = value.strip().strip('"')
+    return release
+
+
+FACT_PARSERS = {
+    "hostname": str.strip,
+    "uptime": parse_uptime,
+    "disk": parse_df,
+    "memory": parse_free,
+    "os": parse_os_release,
+}
+
+
+class FactGatherer:
+    """Typed host facts, cached per host with a TTL per fact type"""
+    
+    def __init__(self, pool, ttls=None, workers=32, clock=time.monotonic):
+        self.pool = pool
+        self.ttls = dict(FACT_TTLS, **(ttls or {}))
+        self.workers = workers
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.cache = {}  # (host, fact) -> (expires_at, value)
+        self.hits = {fact: 0 for fact in FACT_COMMANDS}
+        self.misses = {fact: 0 for fact in FACT_COMMANDS}
+        self.errors = {}  # host -> last gather error
+    
+    def gather(self, server, facts=None):
+        """Facts for one host; stale ones are fetched in a single batch"""
+        facts = list(facts or FACT_COMMANDS)
+        now = self.clock()
+        result, stale = {}, []
+        with self.lock:
+            for fact in facts:
+                entry = self.cache.get((server['host'], fact))
+                if entry and entry[0] > now:
+                    self.hits[fact] += 1
+                    result[fact] = entry[1]
+                else:
+                    self.misses[fact] += 1
+                    stale.append(fact)
+        if not stale:
+            return result
+        
+        with self.pool.connection(server['host'], server['user'], password="password") as ssh:
+            outputs = exec_batch(ssh, [FACT_COMMANDS[fact] for fact in stale])
+        with self.lock:
+            for fact, output in zip(stale, outputs):
+                if output["exit_code"] != 0:
+                    result[fact] = None  # failures are not cached
+                    continue
+                value = FACT_PARSERS[fact](output["output"])
+                self.cache[(server['host'], fact)] = (now + self.ttls[fact], value)
+                result[fact] = value
+        return result
+    
+    def gather_all(self, servers, facts=None):
+        """{host: facts} for many hosts, gathered in parallel; None for hosts that failed"""
+        def gather_one(server):
+            try:
+                return self.gather(server, facts)
+            except Exception as e:
+                with self.lock:
+                    self.errors[server['host']] = str(e) or type(e).__name__
+                return None
+        
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            gathered = executor.map(gather_one, servers)
+            return {server['host']: facts for server, facts in zip(servers, gathered)}
+    
+    def invalidate(self, host=None, facts=None):
+        """Drop cached facts (e.g. after a change): for a host, some facts, or all"""
+        with self.lock:
+            for key in list(self.cache):
+                if (host is None or key[0] == host) and (facts is None or key[1] in facts):
+                    del self.cache[key]
+    
+    def stats(self):
+        """Hit rate overall and per fact type"""
+        with self.lock:
+            hits, misses = sum(self.hits.values()), sum(self.misses.values())
+            return {
+                "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+                "by_fact": {
+                    fact: round(self.hits[fact] / (self.hits[fact] + self.misses[fact]), 3)
+                    if self.hits[fact] + self.misses[fact] else 0.0
+                    for fact in FACT_COMMANDS
+                }
+            }
+
+
+class FakeClock:
+    """Manually advanced clock, so the demo can age the cache"""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+
+clock = FakeClock()
+fact_pool = SSHConnectionPool(client_factory=lambda: MockSSHClient(connect_latency=0.05, exec_latency=0.05,
+                                                                   verbose=False), max_total=128)
+gatherer = FactGatherer(fact_pool, clock=clock)
+fact_fleet = fleet[1:100]
+
+for label, advance in (("cold cache", 0), ("warm cache", 1), ("10s later", 10)):
+    clock.now += advance
+    start = time.perf_counter()
+    facts = gatherer.gather_all(fact_fleet)
+    print(f"  {label:<11} {len(facts)} hosts in {time.perf_counter() - start:.2f}s  {gatherer.stats()['by_fact']}")
+
+gatherer.invalidate(host=fact_fleet[0]['host'])  # e.g. after a package upgrade
+gatherer.gather(fact_fleet[0])
+sample = facts[fact_fleet[0]['host']]
+print(f"  {fact_fleet[0]['host']}: {sample['os']['NAME']} {sample['os']['VERSION']}, "
+      f"load {sample['uptime']['load']}, root {sample['disk'][0]['use_percent']}% used, "
+      f"{sample['memory']['total'] // 1024 ** 3}G RAM")
+print(f"Overall hit rate: {gatherer.stats()['hit_rate']}, connections reused {fact_pool.stats['reuses']}")
+fact_pool.close_all()
+print()
+
+# ===== 9. RETRIES AND CIRCUIT BREAKER =====
+print("=== 9. Scheduled Retries with Circuit Breaker ===")
+
+def backoff_delay(attempt, base=0.1, cap=5.0, rng=random):
+    """Exponential backoff with full jitter, so retries don't synchronize"""
+    return rng.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """Per-host breaker: opens after repeated failures, probes again after a cooldown"""
+    
+    def __init__(self, failure_threshold=3, cooldown=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.hosts = {}  # host -> {"state", "failures", "opened_at"}
+    
+    def state(self, host):
+        """closed, open or half_open"""
+        entry = self.hosts.get(host)
+        if entry is None:
+            return "closed"
+        if entry["state"] == "open" and self.clock() - entry["opened_at"] >= self.cooldown:
+            entry["state"] = "half_open"  # let one attempt through
+        return entry["state"]
+    
+    def allow(self, host):
+        return self.state(host) != "open"
+    
+    def record_success(self, host):
+        self.hosts.pop(host, None)
+    
+    def record_failure(self, host):
+        entry = self.hosts.setdefault(host, {"state": "closed", "failures": 0, "opened_at": 0.0})
+        entry["failures"] += 1
+        if entry["state"] == "half_open" or entry["failures"] >= self.failure_threshold:
+            entry["state"] = "open"
+            entry["opened_at"] = self.clock()
+
+
+class RetryBudget:
+    """Global retry cap: `ratio` retries per first attempt, plus a small floor"""
+    
+    def __init__(self, ratio=0.2, min_retries=10):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.attempts = 0
+        self.retries = 0
+        self.denied = 0
+    
+    def record_attempt(self):
+        self.attempts += 1
+    
+    def try_spend(self):
+        """Take one retry if the budget allows it"""
+        if self.retries < self.min_retries + self.ratio * self.attempts:
+            self.retries += 1
+            return True
+        self.denied += 1
+        return False
+
+
+def iter_run_with_retries(servers, command, client_factory=MockSSHClient, breaker=None, budget=None,
+                          max_attempts=4, base_delay=0.1, max_delay=5.0, workers=32, connect_timeout=5):
+    """Fan-out with retries that are scheduled, not slept
+    
+    Failed hosts go back on a heap with a jittered backoff due time;
+    worker threads never sleep, so one dead host can't stall the rest.
+    Hosts with an open circuit are skipped at once, and retries stop
+    fleet-wide when the retry budget runs out.
+    """
+    breaker = breaker or CircuitBreaker()
+    budget = budget or RetryBudget()
+    due = [(0.0, i, server, 1) for i, server in enumerate(servers)]  # (due time, seq, server, attempt)
+    heapq.heapify(due)
+    seq = len(due)
+    pending = {}
+    
+    def failed(server, attempts, error):
+        return {"host": server['host'], "type": server.get('type'), "error": error, "success": False,
+                "attempts": attempts}
+    
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while due or pending:
+            now = time.monotonic()
+            while due and due[0][0] <= now and len(pending) < workers * 2:
+                _, _, server, attempt = heapq.heappop(due)
+                if not breaker.allow(server['host']):
+                    yield failed(server, attempt - 1, "circuit open")
+                    continue
+                if attempt == 1:
+                    budget.record_attempt()
+                future = executor.submit(_run_one, server, command, None, client_factory, connect_timeout, 30)
+                pending[future] = (server, attempt)
+            
+            if not pending:
+                if due:
+                    time.sleep(max(0.0, due[0][0] - time.monotonic()))  # only the scheduler waits
+                continue
+            # With every slot taken a due retry can't be submitted anyway,
+            # so only wake up for it when there is room
+            if due and len(pending) < workers * 2:
+                timeout = max(0.0, due[0][0] - time.monotonic())
+            else:
+                timeout = None
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                server, attempt = pending.pop(future)
+                result = future.result()
+                if result['success']:
+                    breaker.record_success(server['host'])
+                    result['attempts'] = attempt
+                    yield result
+                    continue
+                breaker.record_failure(server['host'])
+                if attempt >= max_attempts or not breaker.allow(server['host']):
+                    yield failed(server, attempt, result['error'])
+                elif not budget.try_spend():
+                    yield failed(server, attempt, f"retry budget exhausted ({result['error']})")
+                else:
+                    seq += 1
+                    delay = backoff_delay(attempt, base_delay, max_delay)
+                    heapq.heappush(due, (time.monotonic() + delay, seq, server, attempt + 1))
+
+
+class FlakyHostClient(MockSSHClient):
+    """Quiet mock client whose hosts fail a set number of times (or always)"""
+    
+    failures = {}  # host -> remaining failures (float("inf") = unreachable)
+    lock = threading.Lock()
+    
+    def __init__(self):
+        super().__init__(connect_latency=0.02, exec_latency=0.01, verbose=False)
+    
+    def connect(self, hostname, username, password=None, key_filename=None, timeout=30):
+        with self.lock:
+            remaining = self.failures.get(hostname, 0)
+            if remaining:
+                self.failures[hostname] = remaining - 1
+        if remaining:
+            time.sleep(self.connect_latency)
+            raise ConnectionRefusedError(f"connection to {hostname} refused")
+        super().connect(hostname, username, password=password, key_filename=key_filename, timeout=timeout)
+
+
+retry_fleet = fleet[:250]
+dead_hosts = retry_fleet[::50]
+for server in dead_hosts:
+    FlakyHostClient.failures[server['host']] = float("inf")
+for server in retry_fleet[5::10]:
+    FlakyHostClient.failures[server['host']] = 2  # flaky: fails twice, then works
+
+breaker = CircuitBreaker(failure_threshold=3, cooldown=30.0)
+budget = RetryBudget(ratio=0.2, min_retries=10)
+start = time.perf_counter()
+outcomes = list(iter_run_with_retries(retry_fleet, "uptime", client_factory=FlakyHostClient,
+                                      breaker=breaker, budget=budget, max_attempts=4))
+ok = sum(r['success'] for r in outcomes)
+retried_ok = sum(1 for r in outcomes if r['success'] and r['attempts'] > 1)
+print(f"250 hosts (5 down, 25 flaky): {ok} ok ({retried_ok} after retries) in {time.perf_counter() - start:.2f}s, "
+      f"{budget.retries} retries")
+print(f"Sleeping 2s between attempts on the calling thread would have added ~{2 * budget.retries}s")
+
+start = time.perf_counter()
+outcomes = list(iter_run_with_retries(dead_hosts, "uptime", client_factory=FlakyHostClient,
+                                      breaker=breaker, budget=budget))
+skipped = sum(1 for r in outcomes if r['error'] == "circuit open")
+print(f"Next run: {skipped}/{len(dead_hosts)} dead hosts skipped by open circuits in "
+      f"{(time.perf_counter() - start) * 1000:.1f}ms")
+
+subnet = fleet[250:500]
+for server in subnet:
+    FlakyHostClient.failures[server['host']] = float("inf")  # a whole subnet goes dark
+budget = RetryBudget(ratio=0.2, min_retries=10)
+start = time.perf_counter()
+outcomes = list(iter_run_with_retries(subnet, "uptime", client_factory=FlakyHostClient, budget=budget))
+print(f"Subnet outage (250 hosts): {budget.retries} retries allowed, {budget.denied} denied by the budget "
+      f"(unbounded: {3 * len(subnet)}) in {time.perf_counter() - start:.2f}s")
+print()
+
+# ===== 10. TREE-FANOUT FILE DISTRIBUTION =====
+print("=== 10. Tree-Fanout File Distribution ===")
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class HostFailed(Exception):
+    """A host died mid-transfer"""
+
+
+def build_manifest(path, chunk_size=CHUNK_SIZE):
+    """Per-chunk SHA-256 checksums plus the whole-file digest"""
+    chunks, whole = [], hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            data = f.read(chunk_size)
+            if not data:
+                break
+            chunks.append(hashlib.sha256(data).hexdigest())
+            whole.update(data)
+    return {"size": os.path.getsize(path), "chunk_size": chunk_size, "chunks": chunks, "sha256": whole.hexdigest()}
+
+
+class MockHost:
+    """A simulated host: a local directory and a throttled uplink
+    
+    The uplink lock is shared by every transfer the host sends, so
+    sending to k children at once splits its bandwidth k ways.
+    """
+    
+    def __init__(self, name, workdir, manifest, uplink_bps, crash_at=None, drop_at=None, corrupt_at=None):
+        self.name = name
+        self.path = os.path.join(workdir, name, "artifact.bin")
+        self.state_path = self.path + ".part.state"
+        self.manifest = manifest
+        self.uplink_bps = uplink_bps
+        self.uplink = threading.Lock()
+        self.cond = threading.Condition()
+        self.have = 0          # chunks received and verified, in order
+        self.failed = False
+        self.crash_at = crash_at        # dies for good after this many chunks
+        self.drop_at = drop_at          # one dropped connection at this chunk
+        self.corrupt_at = corrupt_at    # one corrupted chunk
+        self.bytes_sent = 0
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+    
+    def load_state(self):
+        """Resume point from the .part.state file of an earlier transfer"""
+        try:
+            with open(self.state_path) as f:
+                self.have = int(f.read() or 0)
+        except (OSError, ValueError):
+            self.have = 0
+        return self.have
+    
+    def send(self, nbytes):
+        """Occupy the uplink for as long as nbytes take at uplink_bps"""
+        with self.uplink:
+            time.sleep(nbytes / self.uplink_bps)
+            self.bytes_sent += nbytes
+    
+    def wait_for(self, index):
+        """Block until chunk `index` is here; raise if this host died"""
+        with self.cond:
+            while self.have <= index and not self.failed:
+                self.cond.wait()
+            if self.have <= index:
+                raise HostFailed(self.name)
+    
+    def read_chunk(self, index):
+        with open(self.path, "rb") as f:
+            f.seek(index * self.manifest["chunk_size"])
+            return f.read(self.manifest["chunk_size"])
+    
+    def receive(self, index, data):
+        """Write one chunk after checking it; returns False on a bad checksum"""
+        if self.crash_at is not None and index >= self.crash_at:
+            self.fail()
+            raise HostFailed(self.name)
+        if self.drop_at == index:
+            self.drop_at = None
+            raise ConnectionResetError(f"connection to {self.name} dropped")
+        if self.corrupt_at == index:
+            self.corrupt_at = None
+            data = data[:-1] + bytes([data[-1] ^ 0xFF])
+        if hashlib.sha256(data).hexdigest() != self.manifest["chunks"][index]:
+            return False
+        with open(self.path, "r+b" if os.path.exists(self.path) else "wb") as f:
+            f.seek(index * self.manifest["chunk_size"])
+            f.write(data)
+        with open(self.state_path, "w") as f:
+            f.write(str(index + 1))
+        with self.cond:
+            self.have = index + 1
+            self.cond.notify_all()
+        return True
+    
+    def fail(self):
+        with self.cond:
+            self.failed = True
+            self.cond.notify_all()
+    
+    def verify(self):
+        """Whole-file checksum against the manifest"""
+        if self.failed or not os.path.exists(self.path):
+            return False
+        return build_manifest(self.path, self.manifest["chunk_size"])["sha256"] == self.manifest["sha256"]
+
+
+class FileDistributor:
+    """Push one artifact to many hosts, star or k-ary relay tree
+    
+    In tree mode the controller feeds `seeds` hosts and every host
+    relays to `fanout` children, forwarding each chunk as soon as it is
+    verified. A dropped transfer resumes from the child's last verified
+    chunk; when a parent dies, its children re-parent to the nearest
+    live ancestor and resume there. A host whose link keeps corrupting
+    chunks is failed after `max_retransmits` bad checksums.
+    """
+    
+    def __init__(self, controller, hosts, pool, fanout=3, seeds=3, max_retries=5, max_retransmits=10):
+        self.controller = controller
+        self.hosts = hosts
+        self.pool = pool
+        self.fanout = fanout
+        self.seeds = seeds
+        self.max_retries = max_retries
+        self.max_retransmits = max_retransmits
+        self.parent = {}
+        self.lock = threading.Lock()
+        self.stats = {"retransmits": 0, "resumes": 0, "reparented": 0}
+    
+    def build_tree(self, star=False):
+        """parent[host] for star (all from the controller) or a k-ary tree"""
+        if star:
+            self.parent = {host.name: self.controller for host in self.hosts}
+            return
+        self.parent = {}
+        for i, host in enumerate(self.hosts):
+            if i < self.seeds:
+                self.parent[host.name] = self.controller
+            else:
+                self.parent[host.name] = self.hosts[(i - self.seeds) // self.fanout]
+    
+    def _live_ancestor(self, host):
+        """Nearest ancestor that is still alive (the controller at worst)"""
+        parent = self.parent[host.name]
+        while parent is not self.controller and parent.failed:
+            parent = self.parent[parent.name]
+        return parent
+    
+    def _transfer(self, host):
+        """Receive the whole artifact on one host from its (current) parent"""
+        chunks = len(self.controller.manifest["chunks"])
+        attempts = retransmits = 0
+        while True:
+            parent = self.parent[host.name]
+            start = host.load_state()
+            if start and start < chunks:
+                with self.lock:
+                    self.stats["resumes"] += 1
+            try:
+                # Stands in for an SFTP channel on the pooled SSH connection
+                with self.pool.connection(host.name, "deploy", password="password"):
+                    index = start
+                    while index < chunks:
+                        parent.wait_for(index)
+                        data = parent.read_chunk(index)
+                        parent.send(len(data))
+                        if host.receive(index, data):
+                            index += 1
+                        else:
+                            with self.lock:
+                                self.stats["retransmits"] += 1
+                            retransmits += 1
+                            if retransmits > self.max_retransmits:
+                                host.fail()
+                                return False
+                return True
+            except HostFailed as e:
+                if str(e) == host.name:
+                    return False  # this host died; its children will re-parent
+                with self.lock:
+                    self.parent[host.name] = self._live_ancestor(host)
+                    self.stats["reparented"] += 1
+            except ConnectionResetError:
+                attempts += 1
+                if attempts > self.max_retries:
+                    host.fail()
+                    return False
+    
+    def distribute(self, star=False):
+        """Run every transfer concurrently; returns seconds taken"""
+        self.build_tree(star)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(self.hosts)) as executor:
+            list(executor.map(self._transfer, self.hosts))
+        return time.perf_counter() - start
+
+
+def run_distribution(source, manifest, count, star, uplink_bps, failures=None):
+    """Fresh mock hosts plus a distributor; returns (seconds, distributor)"""
+    workdir = tempfile.mkdtemp(prefix="fanout-")
+    controller = MockHost("controller", workdir, manifest, uplink_bps)
+    shutil.copy(source, controller.path)
+    controller.have = len(manifest["chunks"])
+    hosts = [MockHost(f"node{i:03}", workdir, manifest, uplink_bps, **(failures or {}).get(i, {}))
+             for i in range(count)]
+    pool = SSHConnectionPool(client_factory=lambda: MockSSHClient(connect_latency=0.01, exec_latency=0.01,
+                                                                  verbose=False), max_total=count * 2)
+    distributor = FileDistributor(controller, hosts, pool, fanout=3, seeds=3)
+    seconds = distributor.distribute(star=star)
+    verified = sum(host.verify() for host in hosts)
+    shutil.rmtree(workdir)
+    return seconds, distributor, verified, controller.bytes_sent
+
+
+artifact_dir = tempfile.mkdtemp(prefix="artifact-")
+artifact = os.path.join(artifact_dir, "release.bin")
+with open(artifact, "wb") as f:
+    f.write(random.Random(1).randbytes(16 * CHUNK_SIZE))
+manifest = build_manifest(artifact)
+uplink = 400 * CHUNK_SIZE  # per-host uplink, bytes/second
+node_count = 60
+
+star_seconds, _, star_ok, star_sent = run_distribution(artifact, manifest, node_count, True, uplink)
+print(f"Star: {star_ok}/{node_count} hosts verified in {star_seconds:.2f}s, "
+      f"controller sent {star_sent // CHUNK_SIZE} MB")
+
+tree_seconds, tree, tree_ok, tree_sent = run_distribution(artifact, manifest, node_count, False, uplink)
+print(f"Tree (k=3): {tree_ok}/{node_count} hosts verified in {tree_seconds:.2f}s, "
+      f"controller sent {tree_sent // CHUNK_SIZE} MB ({star_seconds / tree_seconds:.1f}x faster)")
+
+failures = {1: {"crash_at": 4}, 7: {"drop_at": 9}, 12: {"corrupt_at": 3}}
+seconds, tree, ok, _ = run_distribution(artifact, manifest, node_count, False, uplink, failures)
+print(f"Tree with a relay crash, a dropped link and a corrupt chunk: {ok}/{node_count - 1} live hosts "
+      f"verified in {seconds:.2f}s, {tree.stats}")
+shutil.rmtree(artifact_dir)
+print()
+
+# ===== 11. INVENTORY SELECTORS =====
+print("=== 11. Inventory Selectors ===")
+
+inventory_path = os.path.join(tempfile.gettempdir(), "paramiko_demo_hosts.ini")
+with open(inventory_path, "w") as f:
+    f.write("[web]\n192.168.1.10 user=admin type=web tags=prod\n192.168.1.11 user=admin type=web tags=prod,canary\n"
+            "[db]\n192.168.1.20 user=admin type=db tags=prod\n")
+inventory = Inventory.load(inventory_path)
+selected = inventory.select("web:&prod:!canary")
+print(f"web:&prod:!canary -> {[server['host'] for server in selected]}")
+for r in run_on_servers_parallel(selected, "hostname", client_factory=SimulatedHostClient):
+    print(f"  {'✓' if r['success'] else '✗'} {r['host']} ({r['type']}): {r.get('output', r.get('error'))}")
+print()
+
 print("=" * 60)
 print("           DEMO COMPLETE")
 print("=" * 60)
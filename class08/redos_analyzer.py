@@ -0,0 +1,233 @@
+import math
+import multiprocessing
+import re
+import time
+
+try:
+    from re import _parser as sre_parse
+    from re import _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+from security_scanner import DEFAULT_RULES
+
+C = sre_constants
+SINGLE_CHAR_OPS = (C.LITERAL, C.NOT_LITERAL, C.ANY, C.IN, C.CATEGORY)
+REPEAT_OPS = (C.MAX_REPEAT, C.MIN_REPEAT) + ((C.POSSESSIVE_REPEAT,) if hasattr(C, "POSSESSIVE_REPEAT") else ())
+SIZES = (64, 128, 256, 512, 1024, 2048, 4096)
+SAMPLE_POOL = "a1 +_(.-/=\"',;:)x\t"
+CATEGORY_TESTS = {
+    C.CATEGORY_DIGIT: str.isdigit,
+    C.CATEGORY_NOT_DIGIT: lambda ch: not ch.isdigit(),
+    C.CATEGORY_SPACE: str.isspace,
+    C.CATEGORY_NOT_SPACE: lambda ch: not ch.isspace(),
+    C.CATEGORY_WORD: lambda ch: ch.isalnum() or ch == "_",
+    C.CATEGORY_NOT_WORD: lambda ch: not (ch.isalnum() or ch == "_"),
+}
+
+
+def _char_matches(op, av, ch):
+    """Whether a single-character regex node accepts `ch` (lowercase)"""
+    if op == C.LITERAL:
+        return chr(av).lower() == ch
+    if op == C.NOT_LITERAL:
+        return chr(av).lower() != ch
+    if op == C.ANY:
+        return ch != "\n"
+    if op == C.IN:
+        negate = False
+        found = False
+        for item_op, item_av in av:
+            if item_op == C.NEGATE:
+                negate = True
+            elif item_op == C.LITERAL:
+                found |= chr(item_av).lower() == ch
+            elif item_op == C.RANGE:
+                found |= item_av[0] <= ord(ch) <= item_av[1] or item_av[0] <= ord(ch.upper()) <= item_av[1]
+            elif item_op == C.CATEGORY:
+                found |= CATEGORY_TESTS.get(item_av, lambda _: False)(ch)
+        return found != negate
+    if op == C.CATEGORY:
+        return CATEGORY_TESTS.get(av, lambda _: False)(ch)
+    return False
+
+
+def _sample(items):
+    """A short string matching a parsed (sub)pattern, or None"""
+    out = []
+    for op, av in items:
+        if op == C.LITERAL:
+            out.append(chr(av))
+        elif op in SINGLE_CHAR_OPS:
+            ch = next((c for c in SAMPLE_POOL if _char_matches(op, av, c)), None)
+            if ch is None:
+                return None
+            out.append(ch)
+        elif op in REPEAT_OPS:
+            low, _, sub = av
+            piece = _sample(sub)
+            if piece is None:
+                return None
+            out.append(piece * low)
+        elif op == C.SUBPATTERN:
+            piece = _sample(av[-1])
+            if piece is None:
+                return None
+            out.append(piece)
+        elif op == C.BRANCH:
+            piece = _sample(av[1][0])
+            if piece is None:
+                return None
+            out.append(piece)
+        # AT (anchors), lookarounds and the like add nothing
+    return "".join(out)
+
+
+def _pool_chars(items, chars):
+    """Collect sample characters for every single-char node in a pattern"""
+    for op, av in items:
+        if op == C.LITERAL:
+            chars.add(chr(av).lower())
+        elif op in SINGLE_CHAR_OPS:
+            chars.update(c for c in SAMPLE_POOL if _char_matches(op, av, c))
+        elif op in REPEAT_OPS:
+            _pool_chars(av[2], chars)
+        elif op == C.SUBPATTERN:
+            _pool_chars(av[-1], chars)
+        elif op == C.BRANCH:
+            for branch in av[1]:
+                _pool_chars(branch, chars)
+    return chars
+
+
+def adversarial_inputs(pattern):
+    """Yield (description, prefix, pump, suffix) attack shapes
+
+    For every unbounded repeat in a top-level sequence, the prefix is a
+    sample match of what comes before it, the pump is a string the repeat
+    accepts (tried with characters from every part of the pattern, since
+    overlap between neighbours is what makes backtracking explode) and
+    the suffix is a character meant to make the overall match fail.
+    """
+    parsed = sre_parse.parse(pattern, re.IGNORECASE)
+    sequences = [list(parsed)]
+    if len(parsed) == 1 and parsed[0][0] == C.BRANCH:
+        sequences = [list(branch) for branch in parsed[0][1][1]]
+
+    for sequence in sequences:
+        pool = _pool_chars(sequence, set())
+        for index, (op, av) in enumerate(sequence):
+            if op not in REPEAT_OPS or av[1] < 2:
+                continue
+            prefix = _sample(sequence[:index])
+            if prefix is None:
+                continue
+            pumps = {_sample(av[2])} | {
+                c for c in pool if len(av[2]) == 1 and _char_matches(*av[2][0], c)
+            }
+            for pump in sorted(p for p in pumps if p):
+                yield f"{prefix!r} + {pump!r} * n + '\\x00'", prefix, pump, "\x00"
+
+
+def _time_growth(pattern, prefix, pump, suffix, conn):
+    """Child process: send (n, seconds) for growing input sizes"""
+    compiled = re.compile(pattern, re.IGNORECASE)
+    for n in SIZES:
+        text = prefix + pump * n + suffix
+        # Repeat fast searches (best of 3 batches) so timer noise
+        # doesn't read as growth
+        best = math.inf
+        for _ in range(3):
+            runs = 0
+            started = time.perf_counter()
+            while True:
+                compiled.search(text)
+                runs += 1
+                elapsed = time.perf_counter() - started
+                if elapsed >= 0.005:
+                    break
+            best = min(best, elapsed / runs)
+        conn.send((n, best))
+    conn.close()
+
+
+def analyze_pattern(pattern, time_limit=5.0, exponent_threshold=1.6):
+    """Measure how match time grows on adversarial inputs for one regex
+
+    Each attack shape is timed in a child process so a catastrophic case
+    can be killed after `time_limit` seconds. Growth is the fitted
+    exponent over the largest sizes (1 = linear, 2 = quadratic).
+    """
+    worst = {"risk": "none", "growth": 0.0, "input": None, "timings": []}
+
+    for description, prefix, pump, suffix in adversarial_inputs(pattern):
+        parent_conn, child_conn = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(
+            target=_time_growth, args=(pattern, prefix, pump, suffix, child_conn), daemon=True
+        )
+        process.start()
+        child_conn.close()
+
+        timings = []
+        deadline = time.monotonic() + time_limit
+        while len(timings) < len(SIZES):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not parent_conn.poll(remaining):
+                break
+            try:
+                timings.append(parent_conn.recv())
+            except EOFError:
+                break
+        process.terminate()
+        process.join()
+
+        if len(timings) < len(SIZES):
+            return {"risk": "catastrophic", "growth": math.inf, "input": description, "timings": timings}
+
+        (n1, t1), (n2, t2) = timings[-3], timings[-1]
+        growth = math.log(max(t2, 1e-7) / max(t1, 1e-7)) / math.log(n2 / n1)
+        if growth > worst["growth"]:
+            worst = {
+                "risk": "polynomial" if growth >= exponent_threshold else "none",
+                "growth": round(growth, 2),
+                "input": description,
+                "timings": timings
+            }
+    return worst
+
+
+def analyze_rules(rules, **kwargs):
+    """Analyze every regex rule; riskiest first"""
+    results = []
+    for rule in rules:
+        if "pattern" not in rule:
+            continue
+        result = analyze_pattern(rule["pattern"], **kwargs)
+        result["rule"] = rule["id"]
+        result["pattern"] = rule["pattern"]
+        results.append(result)
+    order = {"catastrophic": 0, "polynomial": 1, "none": 2}
+    results.sort(key=lambda r: (order[r["risk"]], -r["growth"]))
+    return results
+
+
+def main():
+    rules = DEFAULT_RULES + [
+        {"id": "nested_quantifier_example", "pattern": r"^(\w+\s?)+$", "severity": "LOW"},
+    ]
+    for result in analyze_rules(rules):
+        print(f"  [{result['risk'].upper():>12}] {result['rule']:<26} growth n^{result['growth']}")
+        if result["risk"] != "none":
+            print(f"      worst input: {result['input']}")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("       REDOS ANALYZER FOR SAST RULES")
+    print("=" * 60)
+    print()
+    main()
+    print("\n" + "=" * 60)
+    print("           DEMO COMPLETE")
+    print("=" * 60)